@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+import argparse
+import copy
+import threading
+from functools import partial
+from time import monotonic, sleep
+import torch
+from dqn_agent import DQNAgent, select_actions, utilization_threshold
+from network_environment import NetworkEnvironment
+from simulated_environment import SimulatedNetworkEnvironment
+from control_loop import observation_dim
+from replay_buffer import ReplayBuffer
+from vector_env import VectorEnvironment
+
+
+class ParameterServer:
+    """Holds the latest published weights of the Q-network together with a version number."""
+
+    def __init__(self, model):
+        self._lock = threading.Lock()
+        self.version = 0
+        self._state_dict = copy.deepcopy(model.state_dict())
+
+    def publish(self, model):
+        state_dict = {name: tensor.detach().clone() for name, tensor in model.state_dict().items()}
+        with self._lock:
+            self._state_dict = state_dict
+            self.version += 1
+
+    def pull(self, model, version):
+        """Loads the latest weights into `model` if they are newer than `version`, and returns their version."""
+        with self._lock:
+            if self.version == version:
+                return version
+            model.load_state_dict(self._state_dict)
+            return self.version
+
+
+class ActorLearner:
+    """Overlaps environment I/O with gradient updates by running actors and a learner on separate threads.
+
+    Each actor steps its own vector of environments with a local copy of the Q-network and adds transitions to the
+    shared replay buffer. The learner makes minibatch updates continuously and publishes its weights to the actors
+    every `publish_interval` updates. `max_replay_ratio` caps updates per collected transition, so the learner
+    does not overfit a small buffer while the environments are slow.
+    """
+
+    def __init__(self, env_fns_per_actor, agent, buffer, steps_per_episode=20, scenario='test_three',
+                 telemetry_interval=1, publish_interval=50, warmup=64, max_replay_ratio=8):
+        self.env_fns_per_actor = env_fns_per_actor
+        self.agent = agent
+        self.buffer = buffer
+        self.steps_per_episode = steps_per_episode
+        self.scenario = scenario
+        self.telemetry_interval = telemetry_interval
+        self.publish_interval = publish_interval
+        self.warmup = warmup
+        self.max_replay_ratio = max_replay_ratio
+        self.parameters = ParameterServer(agent.model)
+        self.transitions = 0
+        self.updates = 0
+        self.episode_rewards = []
+        self.episode_seconds = []  # (reset, whole episode) wall-clock seconds of every finished episode
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _actor(self, env_fns):
+        envs = VectorEnvironment(env_fns, utilization_threshold, self.agent.n_actions)
+        model = copy.deepcopy(self.agent.model)
+        version = self.parameters.pull(model, -1)
+        try:
+            while not self._stopped.is_set():
+                started = monotonic()
+                envs.call('reset')
+                reset_seconds = monotonic() - started
+                envs.call(self.scenario, (self.steps_per_episode + 1) * self.telemetry_interval)
+                observations, masks = envs.observe()
+                rewards_sum = 0.0
+                for _ in range(self.steps_per_episode):
+                    if self._stopped.is_set():
+                        return
+                    version = self.parameters.pull(model, version)
+                    actions = select_actions(model, observations, masks, self.agent.epsilon())
+                    next_observations, next_masks, rewards = envs.step(actions)
+                    self.buffer.add(observations, actions, rewards, next_observations, next_masks)
+                    observations, masks = next_observations, next_masks
+                    rewards_sum += rewards.mean()
+                    with self._lock:
+                        self.transitions += len(actions)
+                        self.agent.steps += len(actions)
+                with self._lock:
+                    self.episode_rewards.append(rewards_sum / self.steps_per_episode)
+                    self.episode_seconds.append((reset_seconds, monotonic() - started))
+        finally:
+            envs.close()
+
+    def _learner(self):
+        while not self._stopped.is_set():
+            if len(self.buffer) < self.warmup or self.updates >= self.max_replay_ratio * self.transitions:
+                sleep(0.001)  # wait for the actors to collect more transitions
+                continue
+            self.agent.update(self.buffer)
+            self.updates += 1
+            if self.updates % self.publish_interval == 0:
+                self.parameters.publish(self.agent.model)
+
+    def run(self, seconds):
+        """Runs the actors and the learner for `seconds` and returns their throughput."""
+        self._stopped.clear()
+        threads = [threading.Thread(target=self._actor, args=(env_fns,), name=f'actor-{i}', daemon=True)
+                   for i, env_fns in enumerate(self.env_fns_per_actor)]
+        threads.append(threading.Thread(target=self._learner, name='learner', daemon=True))
+        started = monotonic()
+        transitions, updates, episodes = self.transitions, self.updates, len(self.episode_seconds)
+        for thread in threads:
+            thread.start()
+        sleep(seconds)
+        self._stopped.set()
+        for thread in threads:
+            thread.join()
+        self.parameters.publish(self.agent.model)
+        stats = self.throughput(monotonic() - started, self.transitions - transitions, self.updates - updates)
+        return dict(stats, **self.episode_timing(self.episode_seconds[episodes:]))
+
+    def episode_timing(self, episode_seconds):
+        """Returns the number of episodes and their mean reset and total wall-clock seconds."""
+        if not episode_seconds:
+            return {'episodes': 0, 'reset_seconds': 0.0, 'episode_seconds': 0.0}
+        resets, episodes = zip(*episode_seconds)
+        return {'episodes': len(episodes), 'reset_seconds': sum(resets) / len(resets),
+                'episode_seconds': sum(episodes) / len(episodes)}
+
+    def throughput(self, elapsed, transitions, updates):
+        return {'seconds': elapsed, 'transitions': transitions, 'updates': updates,
+                'transitions_per_second': transitions / elapsed, 'updates_per_second': updates / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trains the DQN agent with parallel actors and a learner.')
+    parser.add_argument('--simulated', action='store_true', help='train on simulated networks')
+    parser.add_argument('--actors', type=int, default=2)
+    parser.add_argument('--envs', type=int, default=4, help='simulated networks per actor')
+    parser.add_argument('--seconds', type=float, default=60)
+    parser.add_argument('--output', default='dqn_model.pt')
+    args = parser.parse_args()
+
+    if args.simulated:
+        env_fns_per_actor = [[partial(SimulatedNetworkEnvironment, rate_jitter=0.1, seed=actor * args.envs + i)
+                              for i in range(args.envs)] for actor in range(args.actors)]
+    else:
+        env_fns_per_actor = [[partial(NetworkEnvironment, telemetry_interval=1)]]  # one emulated network per host
+    input_dim = observation_dim(SimulatedNetworkEnvironment().state_dim)  # both default to `TopoThree`
+    agent = DQNAgent(input_dim)
+    buffer = ReplayBuffer(100_000, input_dim, agent.n_actions)
+    pipeline = ActorLearner(env_fns_per_actor, agent, buffer)
+    stats = pipeline.run(args.seconds)
+    print(f'{stats["transitions"]} transitions ({stats["transitions_per_second"]:.1f}/s), '
+          f'{stats["updates"]} updates ({stats["updates_per_second"]:.1f}/s) in {stats["seconds"]:.1f} s, '
+          f'{stats["episodes"]} episodes (reset {stats["reset_seconds"]:.3f} s, episode {stats["episode_seconds"]:.2f} s)')
+    torch.save(agent.model.state_dict(), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+import argparse
+import json
+import tracemalloc
+from time import perf_counter
+import numpy as np
+from control_loop import build_mask, build_observation, observation_dim
+from dqn_agent import DQNAgent, select_actions
+from fake_onos import FakeOnos
+from fake_sflow_rt import FakeSflowRt, interfaces_from_states
+from mininet.log import setLogLevel
+from network_environment import NetworkEnvironment, mininet_link_bw
+from replay_buffer import ReplayBuffer
+from simulated_environment import SimulatedNetworkEnvironment
+from topology_generator import generated_topos, uniform_traffic
+
+default_topologies = ('ring:8', 'leafspine:2:8', 'fattree:4', 'waxman:32:2', 'fattree:6', 'leafspine:4:32',
+                      'fattree:8')
+
+
+def build_topology(spec):
+    """Returns the topology described by `name:arg:...`, e.g. `fattree:4` or `leafspine:2:8`."""
+    name, *args = spec.split(':')
+    return generated_topos[name](*(float(arg) if '.' in arg else int(arg) for arg in args))
+
+
+def _percentiles(samples):
+    values = np.percentile(np.array(samples) * 1000, (50, 95))
+    return {'p50_ms': float(values[0]), 'p95_ms': float(values[1])}
+
+
+def _find_target(env):
+    """Returns `(of_dpid, of_port)` of the busiest interface with flows that can be rerouted."""
+    for row in np.argsort(-env.states.utilization, kind='stable'):
+        of_dpid, of_port = env.states.interface(row)
+        env.get_available_actions(f'of:{of_dpid}', of_port)
+        if env.actions:
+            return of_dpid, of_port
+    return None
+
+
+def _setup(spec, backend, flows_per_host, latency, seed):
+    """Builds the network, agent and backend of a benchmark. Returns the operations, the result and a teardown."""
+    topo = build_topology(spec)
+    env = SimulatedNetworkEnvironment(topo, seed=seed)
+    hosts = topo.hosts()
+    env.start_traffic(uniform_traffic(hosts, flows_per_host * len(hosts), seed=seed), duration=1e9)
+    env.get_states()
+    target = _find_target(env)
+    agent = DQNAgent(observation_dim(env.state_dim))
+    buffer = ReplayBuffer(4 * agent.batch_size, observation_dim(env.state_dim), agent.n_actions, seed=seed)
+    observations = np.stack([build_observation(env.states, env.state_dim)] * agent.batch_size)
+    masks = np.stack([build_mask(len(env.actions))] * agent.batch_size)
+    buffer.add(observations, np.zeros(agent.batch_size, dtype=np.int64), np.zeros(agent.batch_size), observations,
+               masks)
+    action = env.actions[0] if target is not None else None
+
+    teardown = []
+    backend_env = env
+    if backend == 'mocked':
+        fake_sflow_rt = FakeSflowRt(interfaces_from_states(env.states, mininet_link_bw), latency=latency).start()
+        fake_onos = FakeOnos(env, latency=latency).start()
+        backend_env = NetworkEnvironment(topo, emulate=False, onos_url=fake_onos.url, sflow_rt_url=fake_sflow_rt.url)
+        setLogLevel('warning')  # keep the environment's info messages out of the results table
+        teardown = [backend_env.cleanup, fake_onos.stop, fake_sflow_rt.stop]
+
+    def agent_step():
+        select_actions(agent.model, observations[:1], masks[:1], agent.epsilon())
+        agent.update(buffer)
+
+    operations = {'get_states': backend_env.get_states, 'agent_step': agent_step}
+    if target is not None:
+        operations.update(
+            get_available_actions=lambda: backend_env.get_available_actions(f'of:{target[0]}', target[1]),
+            perform_action=lambda: backend_env.perform_action(target[0], action['out_port'], action['in_port'],
+                                                              action['eth_dst'], action['eth_src']))
+    result = {'topology': spec, 'backend': backend, 'switches': len(topo.switches()), 'hosts': len(hosts),
+              'interfaces': env.state_dim, 'flows': len(env.flows)}
+    return operations, result, teardown
+
+
+def benchmark(spec, backend='simulated', steps=100, flows_per_host=2, latency=0.0, seed=0, memory_steps=3):
+    """Measures the latency of the control loop operations and the memory of one topology.
+
+    With the `simulated` backend, the operations are those of `SimulatedNetworkEnvironment`. With the `mocked`
+    backend, they are those of a `NetworkEnvironment` attached to a `FakeSflowRt` and a `FakeOnos` that serve the
+    simulated network, so its request building, parsing and caching costs are measured without Mininet or ONOS.
+
+    The peak memory is traced in a separate pass that builds the benchmark and runs every operation `memory_steps`
+    times, since tracing allocations slows down the timed operations several times over.
+    """
+    tracemalloc.start()
+    operations, _, teardown = _setup(spec, backend, flows_per_host, latency, seed)
+    for operation in operations.values():
+        for _ in range(memory_steps):
+            operation()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    for stop in teardown:
+        stop()
+
+    operations, result, teardown = _setup(spec, backend, flows_per_host, latency, seed)
+    for name, operation in operations.items():
+        samples = []
+        for _ in range(steps):
+            start = perf_counter()
+            operation()
+            samples.append(perf_counter() - start)
+        result[name] = _percentiles(samples)
+    for stop in teardown:
+        stop()
+    result['peak_memory_mb'] = peak_memory / 2 ** 20
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures how the control loop scales with the network size.')
+    parser.add_argument('--topologies', nargs='+', default=default_topologies,
+                        help='topologies as name:arg:..., e.g. fattree:4 ring:16 leafspine:2:8 waxman:32:2')
+    parser.add_argument('--backend', choices=('simulated', 'mocked'), default='simulated')
+    parser.add_argument('--steps', type=int, default=100, help='measurements per operation')
+    parser.add_argument('--flows-per-host', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.0, help='round trip time of the mocked backend')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    benchmark(args.topologies[0], args.backend, 1, args.flows_per_host, memory_steps=1)  # one-time allocations
+    results = []
+    operations = ('get_states', 'get_available_actions', 'perform_action', 'agent_step')
+    print(f'{"topology":<16}{"switches":>9}{"hosts":>7}{"flows":>7}' + ''.join(f'{name:>24}' for name in operations)
+          + f'{"peak MB":>9}')
+    for spec in args.topologies:
+        result = benchmark(spec, args.backend, args.steps, args.flows_per_host, args.latency)
+        results.append(result)
+        cells = ''.join(f'{result[name]["p50_ms"]:>10.3f} / {result[name]["p95_ms"]:<8.3f} ms'
+                        if name in result else f'{"n/a":>24}' for name in operations)
+        print(f'{spec:<16}{result["switches"]:>9}{result["hosts"]:>7}{result["flows"]:>7}{cells}'
+              f'{result["peak_memory_mb"]:>9.1f}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
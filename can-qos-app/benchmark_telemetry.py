@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+import argparse
+from time import perf_counter
+import requests
+from fake_sflow_rt import FakeSflowRt, generate_interfaces
+from telemetry import TelemetryClient
+
+metrics = ('ifoutoctets', 'of_dpid', 'of_port')
+
+
+def _serial_fetch(url):
+    """Fetches the metrics the way `get_states` used to, one new connection per metric."""
+    for metric in metrics:
+        requests.get(f'{url}/dump/TOPOLOGY/{metric}/json').json()
+
+
+def _time(fn, iterations):
+    start = perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares strategies for fetching the sFlow-RT state metrics.')
+    parser.add_argument('--interfaces', type=int, default=64)
+    parser.add_argument('--latency', type=float, default=0.02, help='emulated round trip time in seconds')
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    with FakeSflowRt(generate_interfaces(args.interfaces), latency=args.latency) as fake:
+        concurrent = TelemetryClient(fake.url, multi_metric=False)
+        multi = TelemetryClient(fake.url, multi_metric=True)
+        results = {'serial, new connections': _time(lambda: _serial_fetch(fake.url), args.iterations),
+                   'concurrent, pooled session': _time(lambda: concurrent.fetch(metrics), args.iterations),
+                   'multi-metric query': _time(lambda: multi.fetch(metrics), args.iterations)}
+        concurrent.close()
+        multi.close()
+
+    baseline = results['serial, new connections']
+    print(f'{args.interfaces} interfaces, {args.latency * 1000:.0f} ms emulated latency, {args.iterations} iterations')
+    for name, ms in results.items():
+        print(f'{name:<28} {ms:8.2f} ms/step  {baseline / ms:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+import threading
+import requests
+
+
+class CanQosClient:
+    """Client of the REST API of the can-qos-app ONOS application, served under `/onos/can-qos`."""
+
+    def __init__(self, onos_url, session, poll_timeout=30):
+        self.url = f'{onos_url}/onos/can-qos'
+        self.session = session
+        self.poll_timeout = poll_timeout  # seconds the app holds a long-poll open without events
+
+    def utilizations(self):
+        """Returns `{(device_id, port): utilization}` of every port with port statistics."""
+        r = self.session.get(f'{self.url}/congestion/utilization')
+        response = r.json()
+        return {(port['device'], port['port']): port['utilization'] for port in response['ports']}
+
+    def actions(self, device_id, out_port):
+        """Returns the reroutes of the fwd flows leaving a port, enumerated by the app in one request."""
+        r = self.session.get(f'{self.url}/actions/{device_id}/{out_port}')
+        response = r.json()
+        return [{'eth_src': action['ethSrc'], 'eth_dst': action['ethDst'], 'in_port': action['inPort'],
+                 'out_port': alternative} for action in response['actions'] for alternative in action['alternatives']]
+
+    def events(self, after=0):
+        """Waits for congestion events newer than event `after`. Returns the events and the id to pass next."""
+        r = self.session.get(f'{self.url}/congestion/events',
+                             params={'after': after, 'timeout': int(self.poll_timeout * 1000)},
+                             timeout=self.poll_timeout + 5)
+        response = r.json()
+        return response['events'], response['next']
+
+
+class CongestionEventStream:
+    """Keeps the congested ports of the network up to date from long-polled can-qos-app events.
+
+    `congested` maps the `(device_id, port)` of every congested port to the latest event reporting it, which carries
+    the fwd flows leaving the port as `{'id', 'ethSrc', 'ethDst', 'inPort', 'outPort'}` dicts. Callbacks in
+    `on_event` are called with every event from the polling thread.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.congested = {}
+        self.on_event = []
+        self.condition = threading.Condition()
+        self._last_event = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='congestion-events', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(self.client.poll_timeout + 5)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                events, self._last_event = self.client.events(self._last_event)
+            except (requests.RequestException, ValueError, KeyError):
+                self._stopped.wait(1.0)  # onos or the app is not up yet
+                continue
+            for event in events:
+                self.handle(event)
+
+    def handle(self, event):
+        """Applies one event to `congested` and wakes up threads waiting for congestion."""
+        port = (event['device'], event['port'])
+        with self.condition:
+            if event['type'] == 'CONGESTED':
+                self.congested[port] = event
+            else:
+                self.congested.pop(port, None)
+            self.condition.notify_all()
+        for callback in self.on_event:
+            callback(event)
+
+    def flows(self, device_id, port):
+        """Returns the fwd flows leaving a congested port, or None if the port is not congested."""
+        with self.condition:
+            event = self.congested.get((device_id, port))
+        return None if event is None else event['flows']
+
+    def wait_for_congestion(self, timeout=None):
+        """Waits until a port is congested and returns the congested `(device_id, port)`s, empty on timeout."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.congested, timeout)
+            return list(self.congested)
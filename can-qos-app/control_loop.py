@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+import numpy as np
+from instrumentation import timed
+
+
+def observation_dim(state_dim):
+    """Returns the size of an observation, the interface utilizations followed by a one-hot congested interface."""
+    return 2 * state_dim
+
+
+def build_observation(states, state_dim, target_row=None):
+    """Returns the utilizations of a state store followed by a one-hot encoding of the interface in `target_row`."""
+    observation = np.zeros(observation_dim(state_dim), dtype=np.float32)
+    observation[:state_dim] = states.vector(state_dim)
+    if target_row is not None and target_row < state_dim:
+        observation[state_dim + target_row] = 1.0
+    return observation
+
+
+def build_mask(n_actions, max_actions=4):
+    """Returns a mask flagging the first `n_actions` of `max_actions` as available."""
+    mask = np.zeros(max_actions, dtype=bool)
+    mask[:min(n_actions, max_actions)] = True
+    return mask
+
+
+@timed('observe')
+def observe(env, threshold=0.4, max_actions=4):
+    """Reads the state of an environment and lists the reroutes available at its most congested interface.
+
+    Returns `(observation, mask, target)` where `mask` flags which of the first `max_actions` entries of
+    `env.actions` exist and `target` is the `(of_dpid, of_port)` of the congested interface, or None if no congested
+    interface has flows that can be rerouted.
+    """
+    env.get_states()
+    env.actions = []
+    target = None
+    target_row = None
+    for row in env.states.congested(threshold):
+        of_dpid, of_port = env.states.interface(row)
+        env.get_available_actions(f'of:{of_dpid}', of_port)
+        if env.actions:
+            target = (of_dpid, of_port)
+            target_row = row
+            break
+    return build_observation(env.states, env.state_dim, target_row), build_mask(len(env.actions), max_actions), target
+
+
+@timed('control_step')
+def step(env, target, action_index, threshold=0.4, max_actions=4):
+    """Performs `env.actions[action_index]` at `target`, then observes the result in the next telemetry sample.
+
+    Returns `(observation, mask, target, reward)` of the next step. Without a target, or with an index outside
+    the available actions, no flow is changed, but the step still lasts until the next sample, so every step of
+    an episode spans one telemetry interval.
+    """
+    if target is not None and action_index < min(len(env.actions), max_actions):
+        action = env.actions[action_index]
+        env.perform_action(target[0], action['out_port'], action['in_port'], action['eth_dst'], action['eth_src'])
+    env.wait_for_sample()
+    observation, mask, target = observe(env, threshold, max_actions)
+    env.get_reward()
+    return observation, mask, target, env.reward
@@ -1,96 +1,194 @@
 #!/usr/bin/python
-import random
-import time
+import argparse
+import copy
+from functools import partial
+from time import perf_counter
 import torch
 import numpy as np
 from network_environment import NetworkEnvironment
+from simulated_environment import SimulatedNetworkEnvironment
+from control_loop import observation_dim
+from instrumentation import metrics, timed
+from replay_buffer import ReplayBuffer
+from recorder import EpisodeRecorder
+from vector_env import ProcessVectorEnvironment, VectorEnvironment
 
 # Run code using following steps:
 # - Start ONOS by executing command `bazel run onos-local -- clean debug`
 # - Start sFlow-RT by executing command ´.\sflow-rt\start.sh`
+# Pass `--simulated` to pre-train on simulated networks without ONOS, sFlow-RT or root.
 
-duration = 95  # duration of traffic generation and monitoring
-
-net = NetworkEnvironment()
-net.test_three(duration)
-time.sleep(10)
-net.get_states()
-print('*** STATES ***')
-print(net.states)
-for state in net.states:
-    if state['if_out_utilization'] > 0.4 and state['of_port'] != '0' and state['of_port'] != '1':
-        of_dpid = state['of_dpid']
-        of_port = state['of_port']
-net.get_available_actions(f'of:{of_dpid}', of_port)
-print('*** AVAILABLE ACTIONS ***')
-print(net.actions)
-action = random.choice(net.actions)  # select random action
-eth_src = action['eth_src']
-eth_dst = action['eth_dst']
-in_port = action['in_port']
-out_port = action['out_port']
-net.perform_action(of_dpid, out_port, in_port, eth_dst, eth_src)
-print('*** NEW STATES ***')
-net.get_states()
-print(net.states)
-print('*** REWARD ***')
-net.get_reward()
-print(net.reward)
-print('Network created, tested, and terminated.')
-
-
-# model = torch.nn.Sequential(
-#     torch.nn.Linear(12, 64),
-#     torch.nn.ReLU(),
-#     torch.nn.Linear(64, 64),
-#     torch.nn.ReLU(),
-#     torch.nn.Linear(64, 4)
-# )
-# loss_fn = torch.nn.MSELoss()
-# learning_rate = 0.0003
-# optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
-# gamma = 0.9
-# epsilon = 0.4
-# epochs = 100
-# losses = []
-# for i in range(epochs):
-#     net = NetworkEnvironment
-#     net.get_states()
-#     state1 = net.states
-#     status = 1
-#     while (status == 1):
-#         qval = model(state1)
-#         qval_ = qval.data.numpy()
-#         if (random.random() < epsilon):
-#             action_ = np.random.randint(0, 4)
-#         else:
-#             action_ = np.argmax(qval_)
-#         actions = net.get_available_actions(f'of:{of_dpid}', of_port)
-#         action = random.choice(net.actions)  # select random action
-#         eth_src = action['eth_src']
-#         eth_dst = action['eth_dst']
-#         in_port = action['in_port']
-#         out_port = action['out_port']
-#         net.perform_action(of_dpid, out_port, in_port, eth_dst, eth_src)
-#         net.get_states()
-#         state2 = net.states
-#         reward = net.get_reward()
-#         with torch.no_grad():
-#             newQ = model(state2.rehsape(1, 12))
-#         maxQ = torch.max(newQ)
-#         if reward == -1:
-#             Y = reward + (gamma * maxQ)
-#         else:
-#             Y = reward
-#         Y = torch.Tensor([Y]).detach()
-#         X = qval.squeeze()[action_]
-#         loss = loss_fn(X, Y)
-#         optimizer.zero_grad()
-#         loss.backward()
-#         losses.append(loss.item())
-#         optimizer.step()
-#         state1 = state2
-#         if reward != -1:
-#             status = 0
-#     if epsilon > 0.1:
-#         epsilon -= (1/epochs)
+utilization_threshold = 0.4  # interfaces above this utilization are considered congested
+
+
+def build_model(input_dim, n_actions=4):
+    """Returns the Q-network mapping an observation of size `input_dim` to `n_actions` Q-values."""
+    return torch.nn.Sequential(
+        torch.nn.Linear(input_dim, 64),
+        torch.nn.ReLU(),
+        torch.nn.Linear(64, 64),
+        torch.nn.ReLU(),
+        torch.nn.Linear(64, n_actions)
+    )
+
+
+@timed('model_forward')
+def select_actions(model, observations, masks, epsilon=0.0):
+    """Picks an action for each row of a `(N, input_dim)` batch of observations with one forward pass.
+
+    Actions are chosen epsilon-greedily among those allowed by the `(N, n_actions)` boolean masks. Rows without any
+    allowed action get action 0, which environments treat as a no-op.
+    """
+    with torch.no_grad():
+        q_values = model(torch.as_tensor(observations)).numpy()
+    q_values[~masks] = -np.inf
+    actions = q_values.argmax(axis=1)
+    for i in np.flatnonzero(np.random.random(len(actions)) < epsilon):
+        allowed = np.flatnonzero(masks[i])
+        if len(allowed):
+            actions[i] = np.random.choice(allowed)
+    return actions
+
+
+class DQNAgent:
+    """Deep Q-learning agent with a periodically synced target network and a linear epsilon schedule."""
+
+    def __init__(self, input_dim, n_actions=4, learning_rate=0.0003, gamma=0.9, batch_size=64,
+                 target_sync_interval=250, epsilon_start=0.4, epsilon_end=0.1, epsilon_decay_steps=10_000):
+        self.n_actions = n_actions
+        self.gamma = gamma
+        self.batch_size = batch_size
+        self.target_sync_interval = target_sync_interval  # gradient updates between two target network syncs
+        self.epsilon_start = epsilon_start
+        self.epsilon_end = epsilon_end
+        self.epsilon_decay_steps = epsilon_decay_steps
+        self.model = build_model(input_dim, n_actions)
+        self.target_model = copy.deepcopy(self.model)
+        self.optimizer = torch.optim.Adam(self.model.parameters(), lr=learning_rate)
+        self.loss_fn = torch.nn.MSELoss(reduction='none')
+        self.steps = 0  # environment steps taken, drives the epsilon schedule
+        self.updates = 0
+
+    def epsilon(self):
+        fraction = min(self.steps / self.epsilon_decay_steps, 1.0)
+        return self.epsilon_start + fraction * (self.epsilon_end - self.epsilon_start)
+
+    def act(self, observations, masks):
+        """Returns epsilon-greedy actions for a batch of observations."""
+        actions = select_actions(self.model, observations, masks, self.epsilon())
+        self.steps += len(actions)
+        return actions
+
+    @timed('agent_update')
+    def update(self, buffer):
+        """Performs one gradient update on a minibatch sampled from `buffer` and returns the loss."""
+        batch = buffer.sample(self.batch_size)
+        observations = torch.as_tensor(batch['observations'])
+        actions = torch.as_tensor(batch['actions'])
+        rewards = torch.as_tensor(batch['rewards'])
+        next_observations = torch.as_tensor(batch['next_observations'])
+        next_masks = torch.as_tensor(batch['next_masks'])
+        next_masks[:, 0] |= ~next_masks.any(dim=1)  # without actions only the no-op remains
+        dones = torch.as_tensor(batch['dones'])
+
+        with torch.no_grad():
+            next_q_values = self.target_model(next_observations).masked_fill(~next_masks, -np.inf)
+            targets = rewards + self.gamma * (1 - dones) * next_q_values.max(dim=1).values
+        q_values = self.model(observations).gather(1, actions.unsqueeze(1)).squeeze(1)
+        losses = self.loss_fn(q_values, targets)
+        loss = (losses * torch.as_tensor(batch['weights'])).mean()
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+        if buffer.prioritized:
+            buffer.update_priorities(batch['indices'], (targets - q_values).detach().numpy())
+        self.updates += 1
+        if self.updates % self.target_sync_interval == 0:
+            self.sync_target()
+        return loss.item()
+
+    def sync_target(self):
+        self.target_model.load_state_dict(self.model.state_dict())
+
+
+def train(envs, agent, buffer, episodes=100, steps_per_episode=20, updates_per_step=4, warmup=64,
+          scenario='test_three', telemetry_interval=1, recorder=None):
+    """Trains `agent` on a vector of environments and returns the mean reward of every episode.
+
+    Every transition is stored in `buffer`, and `updates_per_step` minibatch updates are made per environment step
+    once `warmup` transitions have been collected, so each costly transition is learned from many times. The
+    traffic of `scenario` is generated for as long as an episode lasts, after the environments are reset. Steps are
+    also written to `recorder` if given.
+    """
+    episode_rewards = []
+    for episode in range(episodes):
+        started = perf_counter()
+        envs.call('reset')
+        reset_seconds = perf_counter() - started
+        envs.call(scenario, (steps_per_episode + 1) * telemetry_interval)
+        observations, masks = envs.observe()
+        rewards_sum = 0.0
+        for _ in range(steps_per_episode):
+            actions = agent.act(observations, masks)
+            next_observations, next_masks, rewards = envs.step(actions)
+            buffer.add(observations, actions, rewards, next_observations, next_masks)
+            if recorder is not None:
+                recorder.record(episode, observations, masks, actions, rewards, interfaces=envs.interfaces())
+            observations, masks = next_observations, next_masks
+            rewards_sum += rewards.mean()
+            if len(buffer) >= warmup:
+                for _ in range(updates_per_step):
+                    agent.update(buffer)
+        episode_rewards.append(rewards_sum / steps_per_episode)
+        print(f'Episode {episode + 1}/{episodes}: mean reward {episode_rewards[-1]:.3f}, '
+              f'epsilon {agent.epsilon():.2f}, reset {reset_seconds:.2f} s, episode {perf_counter() - started:.2f} s')
+    return episode_rewards
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trains the DQN agent.')
+    parser.add_argument('--simulated', action='store_true', help='train on simulated networks')
+    parser.add_argument('--envs', type=int, default=8, help='number of simulated networks stepped together')
+    parser.add_argument('--processes', action='store_true', help='step the simulated networks in worker processes')
+    parser.add_argument('--episodes', type=int, default=100)
+    parser.add_argument('--steps', type=int, default=20, help='steps per episode')
+    parser.add_argument('--prioritized', action='store_true', help='use prioritized experience replay')
+    parser.add_argument('--output', default='dqn_model.pt')
+    parser.add_argument('--record', metavar='DIRECTORY', help='record every step of the run to a directory')
+    parser.add_argument('--metrics-json', metavar='PATH', help='write the step metrics to a JSON file at the end')
+    parser.add_argument('--metrics-port', type=int, help='serve the step metrics in Prometheus format on this port')
+    parser.add_argument('--profile-steps', type=int, help='write a cProfile of this many steps to --profile-path')
+    parser.add_argument('--profile-path', default='control_loop.prof', help='file the cProfile is written to')
+    args = parser.parse_args()
+
+    metrics.enabled = bool(args.metrics_json or args.metrics_port)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    if args.simulated:
+        vector = ProcessVectorEnvironment if args.processes else VectorEnvironment
+        envs = vector([partial(SimulatedNetworkEnvironment, rate_jitter=0.1, seed=i) for i in range(args.envs)],
+                      utilization_threshold)
+    else:
+        envs = VectorEnvironment([partial(NetworkEnvironment, telemetry_interval=1)], utilization_threshold)
+    input_dim = observation_dim(envs.state_dim)
+    agent = DQNAgent(input_dim)
+    buffer = ReplayBuffer(100_000, input_dim, agent.n_actions, prioritized=args.prioritized)
+    recorder = None
+    if args.record:
+        recorder = EpisodeRecorder(args.record, envs.state_dim, input_dim, agent.n_actions,
+                                   interfaces=envs.interfaces())
+    if args.profile_steps:
+        metrics.profile(args.profile_steps, args.profile_path)  # after setup, so the profile only covers control steps
+    train(envs, agent, buffer, args.episodes, args.steps, recorder=recorder)
+    torch.save(agent.model.state_dict(), args.output)
+    if recorder is not None:
+        recorder.close()
+    if args.metrics_json:
+        metrics.dump_json(args.metrics_json)
+    envs.close()
+
+
+if __name__ == '__main__':
+    main()
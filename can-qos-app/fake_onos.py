@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+import json
+import threading
+from time import sleep
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from simulated_environment import SimulatedNetworkEnvironment
+
+
+def _flow_json(device_id, eth_src, eth_dst, in_port, out_port, app_id='org.onosproject.fwd'):
+    """Returns a flow the way the ONOS `/flows` REST API lists it."""
+    return {'id': str(abs(hash((device_id, eth_src, eth_dst, in_port)))), 'appId': app_id, 'deviceId': device_id,
+            'state': 'ADDED', 'treatment': {'instructions': [{'type': 'OUTPUT', 'port': out_port}]},
+            'selector': {'criteria': [{'type': 'IN_PORT', 'port': in_port}, {'type': 'ETH_DST', 'mac': eth_dst},
+                                      {'type': 'ETH_SRC', 'mac': eth_src}]}}
+
+
+class FakeOnos:
+    """Local stand-in for the ONOS REST API and the can-qos-app endpoints, backed by a simulated network.
+
+    Flows, hosts, paths and links are those of a `SimulatedNetworkEnvironment`, so traffic started in the simulator
+    shows up as fwd flows, and flows posted to `/onos/v1/flows` reroute it. Congestion events are served from
+    `publish` calls to long-polling clients. Every response is delayed by `latency` seconds to emulate a round trip
+    to ONOS.
+    """
+
+    def __init__(self, env=None, latency=0.005, host='127.0.0.1', port=0):
+        self.env = env if env is not None else SimulatedNetworkEnvironment()
+        self.latency = latency
+        self.requests = 0
+        self.events = []
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        self._stopping = False  # releases long-polls, so clients are not left waiting on a stopped server
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.url = f'http://{host}:{self.server.server_address[1]}'
+        self._thread = None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep connections alive between requests
+            disable_nagle_algorithm = True
+
+            def _reply(self, body):
+                with fake._lock:
+                    fake.requests += 1
+                if body is None:
+                    self.send_error(404)
+                    return
+                body = json.dumps(body).encode()
+                sleep(fake.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                with fake._lock:
+                    body = fake.get(url.path.strip('/').split('/'), parse_qs(url.query))
+                self._reply(body)
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with fake._lock:
+                    body = fake.post(url.path.strip('/').split('/'), request)
+                self._reply(body)
+
+            def do_DELETE(self):
+                with fake._lock:
+                    body = fake.delete(urlsplit(self.path).path.strip('/').split('/'))
+                self._reply(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def publish(self, event):
+        """Serves a `{'type', 'device', 'port', 'utilization', 'flows'}` congestion event to long-polling clients."""
+        with self._published:
+            self.events.append(dict(event, id=len(self.events) + 1))
+            self._published.notify_all()
+
+    def flows(self, device_id):
+        """Returns the fwd and app flows installed on a device in ONOS JSON format."""
+        flows = [_flow_json(device_id, *match, out_port)
+                 for match, out_port in self.env.fwd_flows.get(device_id, {}).items()]
+        flows += [_flow_json(device_id, *match, out_port, app_id='99')
+                  for match, out_port in self.env.app_flows.get(device_id, {}).items()]
+        return flows
+
+    def actions(self, device_id, out_port):
+        """Returns the can-qos-app `/actions` response, enumerated with the simulator's path engine.
+
+        Flows are ordered by in port, source and destination MAC address like the app orders them.
+        """
+        actions = []
+        flows = self.env.fwd_flows.get(device_id, {}).items()
+        for (eth_src, eth_dst, in_port), port in sorted(flows, key=lambda flow: (flow[0][2], *flow[0][:2])):
+            if port != out_port:
+                continue
+            dst_device_id = self.env.host_locations[self.env.mac_hosts[eth_dst]][0]
+            alternatives = set()
+            if dst_device_id != device_id:
+                alternatives.update(self.env.path_engine.alternative_ports(device_id, dst_device_id))
+            alternatives.discard(out_port)
+            actions.append({'id': _flow_json(device_id, eth_src, eth_dst, in_port, port)['id'], 'ethSrc': eth_src,
+                            'ethDst': eth_dst, 'inPort': in_port, 'outPort': port,
+                            'alternatives': sorted(alternatives, key=int)})
+        return {'device': device_id, 'port': out_port, 'actions': actions}
+
+    def get(self, parts, query):
+        """Returns the body of a GET request to the path `parts`, or None if ONOS would answer 404.
+
+        Called with the lock held, which long-polls release while they wait for events.
+        """
+        env = self.env
+        if parts[:2] == ['onos', 'can-qos'] and len(parts) == 5 and parts[2] == 'actions':
+            return self.actions(parts[3], parts[4])
+        if parts[:2] == ['onos', 'can-qos'] and parts[2:] == ['congestion', 'events']:
+            after = int(query.get('after', ['0'])[0])
+            timeout = int(query.get('timeout', ['30000'])[0]) / 1000
+            self._published.wait_for(lambda: len(self.events) > after or self._stopping, timeout)
+            return {'events': self.events[after:], 'next': max(after, len(self.events))}
+        if parts[:2] == ['onos', 'can-qos'] and parts[2:] == ['congestion', 'utilization']:
+            ports = zip(env.states.dpid, env.states.port, env.states.utilization)
+            return {'threshold': 0.4, 'ports': [{'device': f'of:{dpid}', 'port': str(port), 'utilization': utilization}
+                                                for dpid, port, utilization in ports]}
+        if parts[:2] != ['onos', 'v1'] or len(parts) < 3:
+            return None
+        resource, args = parts[2], parts[3:]
+        if resource == 'flows' and not args:
+            return {'flows': [flow for device_id in sorted(env.path_engine.devices) for flow in self.flows(device_id)]}
+        if resource == 'flows' and len(args) == 1:
+            return {'flows': self.flows(args[0])}
+        if resource == 'hosts' and len(args) == 2 and args[0] in env.mac_hosts:
+            device_id, port = env.host_locations[env.mac_hosts[args[0]]]
+            return {'id': '/'.join(args), 'mac': args[0], 'locations': [{'elementId': device_id, 'port': port}]}
+        if resource == 'paths' and len(args) == 2:
+            return {'paths': [{'links': [{'src': {'device': args[0], 'port': port}}]}
+                              for port in env.path_engine.alternative_ports(args[0], args[1])]}
+        if resource == 'topology':
+            return {'time': 0, 'devices': len(env.path_engine.devices), 'links': len(env._peers)}
+        if resource == 'devices':
+            return {'devices': [{'id': device_id, 'available': True} for device_id in sorted(env.path_engine.devices)]}
+        if resource == 'links':
+            return {'links': [{'src': {'device': src[0], 'port': src[1]}, 'dst': {'device': dst[0], 'port': dst[1]},
+                               'state': 'ACTIVE'} for src, dst in env._peers.items()]}
+        return None
+
+    def post(self, parts, request):
+        """Installs the flows of a bulk `POST /onos/v1/flows` request in the simulator."""
+        if parts != ['onos', 'v1', 'flows']:
+            return None
+        reroutes = []
+        for flow in request.get('flows', []):
+            criteria = {criterion['type']: criterion for criterion in flow['selector']['criteria']}
+            reroutes.append((flow['deviceId'], criteria['IN_PORT']['port'],
+                             flow['treatment']['instructions'][0]['port'], criteria['ETH_SRC']['mac'],
+                             criteria['ETH_DST']['mac']))
+        self.env.perform_actions(reroutes)
+        return {'flows': [{'deviceId': reroute[0], 'flowId': str(abs(hash(reroute)))} for reroute in reroutes]}
+
+    def delete(self, parts):
+        """Removes the flows of app 99 from the simulator for a `DELETE /onos/v1/flows/application/99` request."""
+        if parts != ['onos', 'v1', 'flows', 'application', '99']:
+            return None
+        self.env.app_flows = {}
+        self.env._routes = None
+        return {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._published:
+            self._stopping = True
+            self._published.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
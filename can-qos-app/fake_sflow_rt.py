@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+import json
+import random
+import socket
+import struct
+import threading
+from time import sleep
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def generate_interfaces(n_interfaces, ports_per_switch=4, seed=0):
+    """Returns sFlow-RT style metrics `{dataSource: {metric: value}}` for a synthetic set of switch interfaces."""
+    rng = random.Random(seed)
+    interfaces = {}
+    for i in range(n_interfaces):
+        interfaces[str(i + 1)] = {'ifoutoctets': rng.uniform(0, 1_250_000),  # up to 10 Mbit/s in bytes per second
+                                  'of_dpid': f'{i // ports_per_switch + 1:016x}',
+                                  'of_port': str(i % ports_per_switch + 1),
+                                  'ifname': f's{i // ports_per_switch + 1}-eth{i % ports_per_switch + 1}'}
+    return interfaces
+
+
+def interfaces_from_states(states, link_bw):
+    """Returns the utilizations of a state store as the metrics sFlow-RT reports for links of `link_bw` bit/s."""
+    return {f'{dpid}-{port}': {'ifoutoctets': utilization * link_bw / 8, 'of_dpid': str(dpid), 'of_port': str(port)}
+            for dpid, port, utilization in zip(states.dpid, states.port, states.utilization)}
+
+
+def encode_counter_datagram(out_octets, uptime, agent='10.0.0.254', sequence=0):
+    """Returns an sFlow v5 datagram with one generic interface counter sample per `{ifIndex: ifOutOctets}` entry."""
+    samples = b''
+    for if_index, octets in out_octets.items():
+        counters = struct.pack('>IIQIIQ6IQ6I', int(if_index), 6, 10_000_000, 1, 3, 0, 0, 0, 0, 0, 0, 0, octets,
+                               0, 0, 0, 0, 0, 0)
+        record = struct.pack('>II', 1, len(counters)) + counters
+        sample = struct.pack('>III', sequence, int(if_index), 1) + record
+        samples += struct.pack('>II', 2, len(sample)) + sample
+    header = struct.pack('>II', 5, 1) + socket.inet_aton(agent) + struct.pack('>IIII', 0, sequence, uptime,
+                                                                                len(out_octets))
+    return header + samples
+
+
+def send_counter_datagram(out_octets, uptime, host='127.0.0.1', port=6343):
+    """Feeds a counter datagram to a local sFlow listener."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.sendto(encode_counter_datagram(out_octets, uptime), (host, port))
+
+
+class FakeSflowRt:
+    """Local stand-in for the sFlow-RT `/dump` REST API with a configurable per-request latency."""
+
+    def __init__(self, interfaces=None, latency=0.02, host='127.0.0.1', port=0, agent='10.0.0.254'):
+        self.interfaces = interfaces if interfaces is not None else generate_interfaces(12)
+        self.latency = latency  # seconds added to every response to emulate a round trip to sFlow-RT
+        self.agent = agent
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.url = f'http://{host}:{self.server.server_address[1]}'
+        self._thread = None
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep connections alive between requests
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests += 1
+                parts = self.path.strip('/').split('/')
+                if len(parts) != 4 or parts[0] != 'dump' or parts[3] != 'json':
+                    self.send_error(404)
+                    return
+                body = json.dumps(fake.dump(parts[2].split(';'))).encode()
+                sleep(fake.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def dump(self, metrics):
+        """Returns the JSON entries sFlow-RT would return for a dump of `metrics`."""
+        return [{'agent': self.agent, 'dataSource': data_source, 'metricName': metric,
+                 'metricValue': values[metric], 'lastUpdate': 0}
+                for metric in metrics for data_source, values in self.interfaces.items() if metric in values]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
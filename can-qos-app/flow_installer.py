@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+import copy
+import json
+import os
+
+default_template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stream_template.json')
+
+
+def _device_id(device_id):
+    """Returns an OpenFlow device ID in the `of:<dpid>` format expected by ONOS."""
+    return device_id if device_id.startswith('of:') else f'of:{device_id}'
+
+
+class FlowInstaller:
+    """Installs reroute flows in ONOS with one bulk request, built from a stream template parsed once."""
+
+    def __init__(self, onos_url, session, app_id='99', template_path=default_template_path):
+        self.onos_url = onos_url
+        self.session = session  # pooled session authenticated with the onos rest api
+        self.app_id = app_id
+        with open(template_path) as f:
+            self.template = json.load(f)
+
+    def build_flow(self, device_id, in_port, out_port, eth_src, eth_dst):
+        """Returns the flow that forwards traffic from `eth_src` to `eth_dst` entering `in_port` out of `out_port`."""
+        flow = copy.deepcopy(self.template)
+        flow['deviceId'] = _device_id(device_id)
+        flow['treatment']['instructions'][0]['port'] = out_port
+        flow['selector']['criteria'][0]['port'] = in_port
+        flow['selector']['criteria'][1]['mac'] = eth_dst
+        flow['selector']['criteria'][2]['mac'] = eth_src
+        return flow
+
+    def install(self, reroutes):
+        """Installs a list of `(device_id, in_port, out_port, eth_src, eth_dst)` reroutes.
+
+        Returns one `{'device_id', 'flow_id', 'status'}` dict per reroute, in the same order. `flow_id` is None if
+        ONOS rejected the request.
+        """
+        flows = [self.build_flow(*reroute) for reroute in reroutes]
+        if not flows:
+            return []
+        r = self.session.post(f'{self.onos_url}/onos/v1/flows?appId={self.app_id}', json={'flows': flows},
+                              headers={'Accept': 'application/json'})
+        installed = r.json().get('flows', []) if r.ok else []
+        statuses = []
+        for i, flow in enumerate(flows):
+            flow_id = installed[i].get('flowId') if i < len(installed) else None
+            statuses.append({'device_id': flow['deviceId'], 'flow_id': flow_id, 'status': r.status_code})
+        return statuses
+
+    def remove_all(self):
+        """Removes every flow installed under the app id with one request. Returns whether ONOS accepted it."""
+        r = self.session.delete(f'{self.onos_url}/onos/v1/flows/application/{self.app_id}')
+        return r.ok
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+import threading
+from time import monotonic
+import requests
+from mininet.log import info
+from instrumentation import timed
+
+fwd_app_id = 'org.onosproject.fwd'
+removed_states = ('PENDING_REMOVE', 'REMOVED')
+
+
+def parse_flow(flow):
+    """Returns `(in_port, eth_src, eth_dst, out_port)` of a flow in ONOS JSON format, with '' for missing fields."""
+    eth_src, eth_dst, in_port, out_port = ('', '', '', '')
+    for instruction in flow['treatment']['instructions']:
+        if instruction.get('type') == 'OUTPUT':
+            out_port = instruction['port']
+    for criterion in flow['selector']['criteria']:
+        if criterion.get('type') == 'IN_PORT':
+            in_port = str(criterion['port'])
+        elif criterion.get('type') == 'ETH_DST':
+            eth_dst = criterion['mac']
+        elif criterion.get('type') == 'ETH_SRC':
+            eth_src = criterion['mac']
+    return in_port, eth_src, eth_dst, out_port
+
+
+def _version(flow):
+    """Returns the fields of a flow in ONOS JSON format that can change while its ID stays the same."""
+    return flow.get('state'), repr(flow['treatment'])
+
+
+class FlowTableMirror:
+    """Local copy of the reactive forwarding flows of all devices, indexed by egress port and by host pair.
+
+    Flows are keyed by `(device_id, in_port, eth_src, eth_dst)`, i.e. by device and selector. The mirror is updated
+    incrementally: `sync` diffs a dump of all flows against the mirror by flow ID and by the fields that can change
+    under the same ID (state and treatment), so only new and changed flows are parsed, and `replace_port` applies
+    the flows of a port reported by a congestion event. With `sync_interval` set, `start` keeps the mirror in sync
+    from a background thread. Lookups only sync a mirror that was never synced, or, without a sync thread and with
+    `max_age` set, one that is older than `max_age` seconds, unless an event filled the port since.
+    """
+
+    def __init__(self, get_flows, app_id=fwd_app_id, sync_interval=None, max_age=None):
+        self.get_flows = get_flows  # returns every flow of the network in ONOS JSON format
+        self.app_id = app_id
+        self.sync_interval = sync_interval
+        self.max_age = max_age
+        self.flows = {}  # (device_id, in_port, eth_src, eth_dst) -> (flow_id, out_port)
+        self.by_out_port = {}  # (device_id, out_port) -> set of flow keys
+        self.by_src_dst = {}  # (eth_src, eth_dst) -> set of flow keys
+        self._keys = {}  # flow_id -> flow key
+        self._versions = {}  # flow_id -> `_version` of the flow in the dump it was synced from
+        self._filled = {}  # (device_id, out_port) -> monotonic time an event replaced the port's flows
+        self.synced = None  # monotonic time of the last sync
+        self.lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self.flows)
+
+    def add(self, device_id, flow_id, in_port, eth_src, eth_dst, out_port):
+        """Adds a flow, replacing the flow with the same selector on the device."""
+        key = (device_id, in_port, eth_src, eth_dst)
+        with self.lock:
+            if key in self.flows:
+                self._remove(key)
+            self.flows[key] = (flow_id, out_port)
+            self._keys[flow_id] = key
+            self.by_out_port.setdefault((device_id, out_port), set()).add(key)
+            self.by_src_dst.setdefault((eth_src, eth_dst), set()).add(key)
+
+    def remove(self, flow_id):
+        """Removes a flow by its ONOS flow ID, if it is mirrored."""
+        with self.lock:
+            key = self._keys.get(flow_id)
+            if key is not None:
+                self._remove(key)
+
+    def _remove(self, key):
+        device_id, _, eth_src, eth_dst = key
+        flow_id, out_port = self.flows.pop(key)
+        if self._keys.get(flow_id) == key:
+            del self._keys[flow_id]
+            self._versions.pop(flow_id, None)
+        for index, index_key in ((self.by_out_port, (device_id, out_port)), (self.by_src_dst, (eth_src, eth_dst))):
+            keys = index[index_key]
+            keys.discard(key)
+            if not keys:
+                del index[index_key]
+
+    @timed('flow_table_sync')
+    def sync(self, flows=None):
+        """Applies the difference between a dump of all flows and the mirror. Returns `(added, removed)` counts.
+
+        A flow whose state or treatment changed counts as removed and added again.
+        """
+        flows = self.get_flows() if flows is None else flows
+        current = {flow['id']: flow for flow in flows
+                   if flow['appId'] == self.app_id and flow.get('state') not in removed_states}
+        with self.lock:
+            removed = [flow_id for flow_id in self._keys
+                       if flow_id not in current or self._versions.get(flow_id) != _version(current[flow_id])]
+            for flow_id in removed:
+                self.remove(flow_id)
+            added = [flow for flow_id, flow in current.items() if flow_id not in self._keys]
+            for flow in added:
+                self.add(flow['deviceId'], flow['id'], *parse_flow(flow))
+                self._versions[flow['id']] = _version(flow)
+            self._filled.clear()  # the dump is at least as recent as the events
+            self.synced = monotonic()
+        return len(added), len(removed)
+
+    def replace_port(self, device_id, out_port, flows):
+        """Replaces the flows leaving a port with `{'id', 'ethSrc', 'ethDst', 'inPort'}` dicts from an event."""
+        with self.lock:
+            for key in list(self.by_out_port.get((device_id, out_port), ())):
+                self._remove(key)
+            for flow in flows:
+                self.add(device_id, flow['id'], flow['inPort'], flow['ethSrc'], flow['ethDst'], out_port)
+            self._filled[device_id, out_port] = monotonic()
+
+    def _is_fresh(self, synced):
+        return synced is not None and (self.max_age is None or monotonic() - synced <= self.max_age)
+
+    def _ensure_fresh(self, port=None):
+        if self._is_fresh(self._filled.get(port)):
+            return
+        if self.synced is None or (self._thread is None and not self._is_fresh(self.synced)):
+            self.sync()  # with a sync thread, only until its first sync finished
+
+    def flows_on_port(self, device_id, out_port):
+        """Returns `(eth_src, eth_dst, in_port, out_port)` of the flows leaving a port of a device."""
+        self._ensure_fresh((device_id, out_port))
+        with self.lock:
+            keys = self.by_out_port.get((device_id, out_port), ())
+            return [(eth_src, eth_dst, in_port, out_port) for _, in_port, eth_src, eth_dst in sorted(keys)]
+
+    def flows_between(self, eth_src, eth_dst):
+        """Returns `(device_id, in_port, out_port)` of the flows from `eth_src` to `eth_dst` on every device."""
+        self._ensure_fresh()
+        with self.lock:
+            keys = self.by_src_dst.get((eth_src, eth_dst), ())
+            return [(device_id, in_port, self.flows[device_id, in_port, eth_src, eth_dst][1])
+                    for device_id, in_port, _, _ in sorted(keys)]
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='flow-table-mirror', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.sync()
+            except requests.RequestException as e:
+                info(f'*** Failed to sync flows from onos: {e}\n')
+            self._stopped.wait(self.sync_interval)
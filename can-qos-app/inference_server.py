@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+import argparse
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future
+from time import perf_counter, sleep
+import numpy as np
+import torch
+from dqn_agent import build_model, utilization_threshold
+from network_environment import NetworkEnvironment
+from simulated_environment import SimulatedNetworkEnvironment
+from control_loop import build_mask, build_observation, observation_dim
+
+_flush = object()  # queued by `flush` to close the batch being gathered
+
+
+class InferenceServer:
+    """Answers rerouting decisions in micro-batches, each evaluated with one no-grad forward pass of the Q-network.
+
+    Requests are gathered until `max_batch_size` are waiting, the oldest has waited `max_wait` seconds or `flush` is
+    called. If the forward pass raises, the exception is set on the futures of the batch. With `torchscript=True`
+    the model is compiled with TorchScript and frozen for CPU inference first.
+    """
+
+    def __init__(self, model, max_batch_size=64, max_wait=0.002, torchscript=False, latency_window=10_000):
+        model.eval()
+        if torchscript:
+            model = torch.jit.optimize_for_inference(torch.jit.script(model))
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.latencies = deque(maxlen=latency_window)  # seconds from submit to answer of the latest requests
+        self.batch_sizes = deque(maxlen=latency_window)
+        self._requests = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='inference-server', daemon=True)
+        self._thread.start()
+
+    def submit(self, observation, mask):
+        """Queues a decision and returns a future resolving to the index of the best allowed action."""
+        future = Future()
+        self._requests.put((observation, mask, future, perf_counter()))
+        return future
+
+    def flush(self):
+        """Evaluates the requests submitted so far without waiting for more."""
+        self._requests.put(_flush)
+
+    def _next_batch(self):
+        batch = []
+        while not batch:
+            request = self._requests.get(timeout=0.1)
+            if request is not _flush:
+                batch.append(request)
+        deadline = batch[0][3] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                request = self._requests.get(timeout=max(0.0, deadline - perf_counter()))
+            except queue.Empty:
+                break
+            if request is _flush:
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                batch = self._next_batch()
+            except queue.Empty:
+                continue
+            try:
+                observations = torch.as_tensor(np.stack([request[0] for request in batch]))
+                masks = np.stack([request[1] for request in batch])
+                with torch.no_grad():
+                    q_values = self.model(observations).numpy()
+            except Exception as e:
+                for _, _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            q_values[~masks] = -np.inf
+            actions = q_values.argmax(axis=1)
+            answered = perf_counter()
+            for (_, _, future, submitted), action in zip(batch, actions):
+                future.set_result(int(action))
+                self.latencies.append(answered - submitted)
+            self.batch_sizes.append(len(batch))
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        """Returns the request latency percentiles in milliseconds."""
+        if not self.latencies:
+            return {}
+        values = np.percentile(np.array(self.latencies) * 1000, percentiles)
+        return {f'p{p}': float(value) for p, value in zip(percentiles, values)}
+
+    def decide(self, env, threshold=utilization_threshold, max_actions=4):
+        """Decides a reroute for every congested interface of `env` that has flows to reroute.
+
+        Returns `(device_id, in_port, out_port, eth_src, eth_dst)` reroutes ready for `env.perform_actions`.
+        """
+        env.get_states()
+        candidates = []
+        for row in env.states.congested(threshold):
+            of_dpid, of_port = env.states.interface(row)
+            env.get_available_actions(f'of:{of_dpid}', of_port)
+            if env.actions:
+                candidates.append((row, of_dpid, env.actions))
+
+        # Submit all requests at once so they are evaluated in the same batch
+        futures = [self.submit(build_observation(env.states, env.state_dim, row), build_mask(len(actions), max_actions))
+                   for row, _, actions in candidates]
+        if futures:
+            self.flush()
+        reroutes = []
+        for (_, of_dpid, actions), future in zip(candidates, futures):
+            action = actions[future.result()]
+            reroutes.append((of_dpid, action['in_port'], action['out_port'], action['eth_src'], action['eth_dst']))
+        return reroutes
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reroutes congested flows online with a trained Q-network.')
+    parser.add_argument('--model', default='dqn_model.pt')
+    parser.add_argument('--simulated', action='store_true', help='control a simulated network')
+    parser.add_argument('--torchscript', action='store_true')
+    parser.add_argument('--steps', type=int, default=60)
+    args = parser.parse_args()
+
+    if args.simulated:
+        env = SimulatedNetworkEnvironment()
+    else:
+        env = NetworkEnvironment(telemetry_interval=1)
+    model = build_model(observation_dim(env.state_dim))
+    model.load_state_dict(torch.load(args.model))
+    server = InferenceServer(model, torchscript=args.torchscript)
+    env.test_three(args.steps)
+    for _ in range(args.steps):
+        reroutes = server.decide(env)
+        env.perform_actions(reroutes)
+        if not args.simulated:
+            sleep(env.collector.interval)  # decide once per telemetry interval
+    print(f'Latency per request: {server.latency_percentiles()}')
+    server.close()
+    env.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+import bisect
+import cProfile
+import functools
+import json
+import threading
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from urllib.parse import urlsplit
+
+# Upper bounds in seconds of the latency histogram buckets, from simulated steps to slow REST calls
+latency_buckets = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_disabled_span = nullcontext()
+
+
+def _series(name, labels):
+    """Returns a metric name with its labels in the Prometheus text format, e.g. `name{client="onos"}`."""
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class Histogram:
+    """Counts observations in cumulative buckets like a Prometheus histogram."""
+
+    def __init__(self, buckets=latency_buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last bucket counts observations above all bounds
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Returns `(upper bound, observations up to the bound)` of every bucket, ending with `+Inf`."""
+        total = 0
+        bounds = []
+        for bound, count in zip((*self.buckets, float('inf')), self.counts):
+            total += count
+            bounds.append((bound, total))
+        return bounds
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe('span_seconds', perf_counter() - self.started, span=self.name)
+        if self.name == self.metrics.profile_span:
+            self.metrics._profiled_step()
+
+
+class Metrics:
+    """Registry of counters and latency histograms of the control loop, exported as Prometheus text or JSON.
+
+    Instrumentation is disabled until `enabled` is set: `span` then returns a shared no-op context manager and the
+    HTTP hooks return at once, so instrumented code pays one attribute lookup per call. Spans record their
+    wall-clock time in the `span_seconds` histogram, labelled with the span name. `profile` captures a cProfile of
+    the next steps of the thread that calls it.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.profile_span = None  # span that counts the steps of a profile
+        self._profiler = None
+        self._profile_steps = 0
+        self._profile_path = None
+        self._lock = threading.Lock()
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def span(self, name):
+        """Returns a context manager that times the code it wraps as span `name`."""
+        if not self.enabled:
+            return _disabled_span
+        return _Span(self, name)
+
+    def response_hook(self, client):
+        """Returns a `requests` response hook that counts the calls, bytes and latency of a REST client."""
+        def hook(r, *args, **kwargs):
+            if not self.enabled:
+                return
+            method = r.request.method
+            endpoint = '/'.join(urlsplit(r.url).path.split('/')[:4])  # e.g. /onos/v1/flows, without device IDs
+            self.count('http_requests_total', client=client, method=method, status=r.status_code)
+            self.count('http_request_bytes_total', len(r.request.body or b''), client=client)
+            self.count('http_response_bytes_total', len(r.content), client=client)
+            self.observe('http_request_seconds', r.elapsed.total_seconds(), client=client, endpoint=endpoint)
+        return hook
+
+    def profile(self, steps, path='control_loop.prof', span='control_step'):
+        """Profiles the calling thread for the next `steps` spans named `span` and writes the stats to `path`.
+
+        Enables the instrumentation, since steps are counted by their spans. The stats can be read with `pstats`
+        or `python -m pstats <path>`.
+        """
+        self.enabled = True
+        self.profile_span = span
+        self._profile_steps = steps
+        self._profile_path = path
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def _profiled_step(self):
+        self._profile_steps -= 1
+        if self._profile_steps <= 0 and self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self._profile_path)
+            self._profiler = None
+            self.profile_span = None
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def to_dict(self):
+        """Returns the counters and histograms keyed by their Prometheus series names."""
+        with self._lock:
+            counters = {_series(name, labels): value for (name, labels), value in sorted(self.counters.items())}
+            histograms = {_series(name, labels): {'count': h.count, 'sum': h.sum,
+                                                  'mean': h.sum / h.count if h.count else 0.0,
+                                                  'buckets': {str(bound): count for bound, count in h.cumulative()}}
+                          for (name, labels), h in sorted(self.histograms.items())}
+        return {'counters': counters, 'histograms': histograms}
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def prometheus(self):
+        """Returns the counters and histograms in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f'# TYPE {name} counter')
+                lines += [f'{_series(name, labels)} {value}'
+                          for (series_name, labels), value in sorted(self.counters.items()) if series_name == name]
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f'# TYPE {name} histogram')
+                for (series_name, labels), h in sorted(self.histograms.items()):
+                    if series_name != name:
+                        continue
+                    for bound, count in h.cumulative():
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{_series(name + "_bucket", (*labels, ("le", le)))} {count}')
+                    lines.append(f'{_series(name + "_sum", labels)} {h.sum}')
+                    lines.append(f'{_series(name + "_count", labels)} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9100, host='0.0.0.0'):
+        """Serves the Prometheus text on `/metrics` from a background thread and returns the HTTP server."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if urlsplit(self.path).path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        return server
+
+
+metrics = Metrics()  # shared by all instrumented modules
+
+
+def timed(name):
+    """Decorates a function to run in span `name` of the shared registry."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            with metrics.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
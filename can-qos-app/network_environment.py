@@ -1,6 +1,8 @@
 #!/usr/bin/env python
+import re
+from functools import partial
+import numpy as np
 import requests
-import json
 from time import sleep, time
 from mininet.net import Mininet
 from mininet.topo import Topo
@@ -9,6 +11,18 @@ from mininet.link import TCLink
 from mininet.cli import CLI
 from mininet.clean import Cleanup
 from mininet.log import setLogLevel, info
+from telemetry import TelemetryClient
+from telemetry_collector import TelemetryCollector
+from state_store import StateStore
+from topology_cache import TopologyCache
+from path_engine import PathEngine
+from flow_installer import FlowInstaller
+from flow_table import FlowTableMirror
+from rest import create_session
+from instrumentation import timed
+from can_qos_client import CanQosClient, CongestionEventStream
+from topology_generator import FatTree, LeafSpine, Ring, Waxman
+from traffic_scenarios import ScenarioEngine, from_traffic_matrix, traffic_matrices
 
 # Configure connection to sflow and onos
 machine_ip_address = '127.0.0.1'
@@ -16,11 +30,18 @@ sflow_rt_port = '8008'
 onos_port = '8181'
 onos_creds = ('onos', 'rocks')  # used to authenticate with the rest api
 mininet_link_bw = 10 * 1_000_000
+idle_utilization = 0.01  # utilization below which an interface counts as idle after a reset
+sflow_polling_interval = 1  # seconds between two counter samples sflow-rt takes of an interface
 
 # The ip address of sflow-rt and onos
 sflow_rt = f'http://{machine_ip_address}:{sflow_rt_port}'
 onos = f'http://{machine_ip_address}:{onos_port}'
 
+# The sflow-rt metrics that make up the state of the network
+telemetry_metrics = ('ifoutoctets', 'of_dpid', 'of_port')
+
+_onos_session = create_session(auth=onos_creds, client='onos')  # keep-alive connection reused by all onos rest calls
+
 
 def _parse_json(data, link_utilization=False):
     output = {}
@@ -39,148 +60,291 @@ def _get_interface_names():
     return _parse_json(data)
 
 
-def _get_interface_utilizations():
-    """Returns interface utilizations."""
-    r = requests.get(f'{sflow_rt}/dump/TOPOLOGY/ifoutoctets/json')
-    data = r.json()
-    return _parse_json(data, True)
+def _get_flows(url=onos):
+    """Returns all flows of all devices."""
+    r = _onos_session.get(f'{url}/onos/v1/flows')
+    response = r.json()
+    return response['flows']
 
 
-def _get_openflow_device_id():
-    """Returns OpenFlow device IDs."""
-    r = requests.get(f'{sflow_rt}/dump/TOPOLOGY/of_dpid/json')
-    data = r.json()
-    return _parse_json(data)
+def _get_switch_connected_to_host(host_id, url=onos):
+    """Returns the list of a hosts immediate switches."""
+    locations = []
+    r = _onos_session.get(f'{url}/onos/v1/hosts/{host_id}')
+    response = r.json()
+    for location in response['locations']:
+        locations.append(location['elementId'])
+    return locations
 
 
-def _get_openflow_port_number():
-    """Returns OpenFlow port numbers."""
-    r = requests.get(f'{sflow_rt}/dump/TOPOLOGY/of_port/json')
-    data = r.json()
-    return _parse_json(data)
+def _get_topology_version(url=onos):
+    """Returns a value that changes whenever the ONOS topology changes."""
+    r = _onos_session.get(f'{url}/onos/v1/topology')
+    response = r.json()
+    return response['time'], response['devices'], response['links']
 
 
-def _filter_eth_src_dst_in_out_port_from_flows(device_id):
-    """ Returns tuple `(eth_src, eth_dst, in_port, out_port)` from existing flows."""
-    src_dst_pairs = []
-    r = requests.get(f'{onos}/onos/v1/flows/{device_id}', auth=onos_creds)
+def _get_devices(url=onos):
+    """Returns the IDs of all available devices."""
+    r = _onos_session.get(f'{url}/onos/v1/devices')
     response = r.json()
-    for flow in response['flows']:
-        eth_src, eth_dst, in_port, out_port = ('', '', '', '')
-        if flow['appId'] == 'org.onosproject.fwd':
-            for instruction in flow['treatment']['instructions']:
-                if 'type' in instruction:  # perhaps redundant
-                    if instruction['type'] == 'OUTPUT':
-                        out_port = instruction['port']
-            for criteria in flow['selector']['criteria']:
-                if 'type' in criteria:  # perhaps redundant
-                    if criteria['type'] == 'IN_PORT':
-                        in_port = criteria['port']
-                    if criteria['type'] == 'ETH_DST':
-                        eth_dst = criteria['mac']
-                    if criteria['type'] == 'ETH_SRC':
-                        eth_src = criteria['mac']
-                if eth_src and eth_dst:
-                    src_dst_pairs.append((eth_src, eth_dst, in_port, out_port))
-    return src_dst_pairs
-
-
-def _get_alternative_paths_from_switch(src_device_id, dst_device_id):
-    """Finds an alternative shortest path from a specific switch to the destination."""
-    paths = []
-    r = requests.get(f'{onos}/onos/v1/paths/{src_device_id}/{dst_device_id}', auth=onos_creds)
-    response = r.json()
-    for path in response['paths']:
-        paths.append(path['links'][0]['src']['port'])
-    return paths
+    return [device['id'] for device in response['devices'] if device['available']]
 
 
-def _get_switch_connected_to_host(host_id):
-    """Returns the list of a hosts immediate switches."""
-    locations = []
-    r = requests.get(f'{onos}/onos/v1/hosts/{host_id}', auth=onos_creds)
+def _get_links(capacities=None, url=onos):
+    """Returns tuples `(src_device, src_port, dst_device, dst_port, capacity)` of all active links."""
+    links = []
+    capacities = capacities or {}
+    r = _onos_session.get(f'{url}/onos/v1/links')
     response = r.json()
-    for location in response['locations']:
-        locations.append(location['elementId'])
-    return locations
+    for link in response['links']:
+        if link['state'] == 'ACTIVE':
+            src, dst = link['src'], link['dst']
+            capacity = capacities.get((src['device'], src['port']), mininet_link_bw)
+            links.append((src['device'], src['port'], dst['device'], dst['port'], capacity))
+    return links
+
+
+def rank_ports(routes, out_port):
+    """Returns the egress ports of `(port, hops, capacity)` routes except `out_port`, shortest and widest first.
+
+    A port that leads to several destinations is ranked by its best route. Ties are broken by port number.
+    """
+    ranks = {}
+    for port, hops, capacity in routes:
+        ranks[port] = min(ranks.get(port, (hops, -capacity)), (hops, -capacity))
+    ranks.pop(out_port, None)  # remove current path from alternative paths
+    return sorted(ranks, key=lambda port: (*ranks[port], int(port)))
+
+
+def dpid_from_name(switch_name):
+    """Returns the datapath ID Mininet assigns to a switch, derived from the first number in its name."""
+    return f'{int(re.findall(r"[0-9]+", switch_name)[0]):016x}'
+
+
+def _count_switch_ports(topo):
+    """Returns the number of switch interfaces in a topology, i.e. the size of its state vector."""
+    return sum(1 for link in topo.links() for node in link if topo.isSwitch(node))
+
+
+def _link_capacities(topo):
+    """Returns the bandwidth in bit/s of every switch port with a `TCLink`, keyed by ONOS `(device_id, port)`."""
+    capacities = {}
+    for node1, node2, link_info in topo.links(withInfo=True):
+        for node, port in ((node1, link_info['port1']), (node2, link_info['port2'])):
+            if topo.isSwitch(node) and 'bw' in link_info:
+                capacities[f'of:{dpid_from_name(node)}', str(port)] = link_info['bw'] * 1_000_000
+    return capacities
+
+
+def _host_ports(topo):
+    """Returns the ONOS `(device_id, port)` of the switch port every host is attached to."""
+    ports = {}
+    for node1, node2, link_info in topo.links(withInfo=True):
+        for host, switch, port in ((node1, node2, link_info['port2']), (node2, node1, link_info['port1'])):
+            if not topo.isSwitch(host) and topo.isSwitch(switch):
+                ports[host] = (f'of:{dpid_from_name(switch)}', str(port))
+    return ports
 
 
 class NetworkEnvironment:
-    def __init__(self):
+    def __init__(self, topo=None, controller_port=6633, cleanup=True, path_stretch=0, telemetry_interval=None,
+                 congestion_events=False, server_actions=False, flow_sync_interval=1.0, emulate=True, onos_url=onos,
+                 sflow_rt_url=sflow_rt):
         setLogLevel('info')
-        Cleanup.cleanup()  # clean up any running mininet network
-        self.enable_sflow_rt()  # compile and run sflow-rt helper script
-        self.net = Mininet(topo=TopoThree(),
-                           controller=lambda name: RemoteController(name, ip='127.0.0.1', port=6633, protocol='tcp'))
-        self.net.start()
+        self.onos_url = onos_url
+        if emulate:
+            if cleanup:
+                Cleanup.cleanup()  # clean up any running mininet network
+            self.enable_sflow_rt()  # compile and run sflow-rt helper script
+        self.telemetry = TelemetryClient(sflow_rt_url)
+        self.states = StateStore()
+        self.collector = None  # streams telemetry in the background when `telemetry_interval` is set
+        if telemetry_interval is not None:
+            self.collector = TelemetryCollector(self.telemetry, mininet_link_bw, interval=telemetry_interval).start()
+        self.topology_cache = TopologyCache(partial(_get_switch_connected_to_host, url=onos_url),
+                                            partial(_get_topology_version, url=onos_url))
+        self.flow_installer = FlowInstaller(onos_url, _onos_session, app_id='99')  # 99 is an arbitrary can-qos-app id
+        self.path_stretch = path_stretch  # 0 keeps shortest paths only, 1 also allows paths one hop longer
+        self.path_engine = None  # built from the onos link graph on first use
+        self.topology_cache.on_change.append(self._drop_path_engine)
+        # fwd flows of all devices, kept in sync from a background thread or, without one, re-synced by lookups
+        # once the dump is older than a telemetry sample. Congestion events fill the ports they report at once, but
+        # congested ports are picked from the telemetry, so the ports without events need syncing in both modes.
+        self.flow_table = FlowTableMirror(partial(_get_flows, url=onos_url), sync_interval=flow_sync_interval,
+                                          max_age=sflow_polling_interval if flow_sync_interval is None else None)
+        if flow_sync_interval is not None:
+            self.flow_table.start()
+        self.can_qos = CanQosClient(onos_url, _onos_session)
+        self.server_actions = server_actions  # let the can-qos-app enumerate actions in one request
+        self.congestion_events = None  # pushed by the can-qos-app onos application when `congestion_events` is set
+        if congestion_events:
+            self.congestion_events = CongestionEventStream(self.can_qos)
+            self.congestion_events.on_event.append(self._mirror_event_flows)
+            self.congestion_events.start()
+        topo = topo if topo is not None else TopoThree()
+        self.state_dim = _count_switch_ports(topo)
+        self.link_capacities = _link_capacities(topo)
+        self.host_ports = _host_ports(topo)
+        self.scenario = None  # traffic schedule played on the hosts
+        self.net = None  # without `emulate`, the environment attaches to a network that is already running
+        if emulate:
+            self.net = Mininet(topo=topo,
+                               controller=lambda name: RemoteController(name, ip='127.0.0.1', port=controller_port,
+                                                                        protocol='tcp'))
+            self.net.start()
+
+    @timed('reset')
+    def reset(self, settle_timeout=10):
+        """Stops all traffic and removes the reroutes of the agent, keeping the Mininet network running.
+
+        Kills the iperf flows, deletes the flows of app id 99 with one ONOS request and waits until a sample taken
+        after that shows every interface idle. Returns whether the counters settled within `settle_timeout` seconds,
+        which they never do while the telemetry reports no interfaces at all.
+        """
+        self.stop_scenario()
+        if not self.flow_installer.remove_all():
+            info(f'*** Failed to remove the flows of app {self.flow_installer.app_id}\n')
+
+        def idle(states):
+            return len(states) > 0 and bool(np.all(states.utilization < idle_utilization))
+
+        return self._wait_for_telemetry(idle, settle_timeout, fresh=True)
 
     def perform_action(self, device_id, out_port, in_port, eth_dst, eth_src):
-        app_id = '99'  # 99 is an arbitrary id used for the can-qos-app
-        header = {'Content-Type': 'application/json',
-                  'Accept': 'application/json'}  # defines the header for the request
-
-        # Load the stream template for the post request
-        with open('stream_template.json') as f:
-            stream = json.load(f)
-
-        # Format the post request
-        stream['deviceId'] = device_id
-        stream['treatment']['instructions'][0]['port'] = out_port
-        stream['selector']['criteria'][0]['port'] = in_port
-        stream['selector']['criteria'][1]['mac'] = eth_dst
-        stream['selector']['criteria'][2]['mac'] = eth_src
-
-        # Process the post request
-        r = requests.post(f'{onos}/onos/v1/flows/{device_id}?appId={app_id}', data=json.dumps(stream), auth=onos_creds,
-                          headers=header)
-        print(r.status_code)
-
+        """Reroutes the flow from `eth_src` to `eth_dst` entering `in_port` of a device out of `out_port`."""
+        return self.perform_actions([(device_id, in_port, out_port, eth_src, eth_dst)])[0]
+
+    @timed('perform_actions')
+    def perform_actions(self, reroutes):
+        """Installs a list of `(device_id, in_port, out_port, eth_src, eth_dst)` reroutes with one ONOS request."""
+        statuses = self.flow_installer.install(reroutes)
+        for status in statuses:
+            if status['flow_id'] is None:
+                info(f'*** Failed to install flow on {status["device_id"]} (HTTP {status["status"]})\n')
+        return statuses
+
+    def _mirror_event_flows(self, event):
+        if event['type'] == 'CONGESTED':
+            self.flow_table.replace_port(event['device'], event['port'], event['flows'])
+
+    def _drop_path_engine(self):
+        self.path_engine = None
+
+    def _get_path_engine(self):
+        """Returns the path engine, pulling the link graph from ONOS if the topology changed since it was built."""
+        if self.path_engine is None:
+            self.path_engine = PathEngine(_get_links(self.link_capacities, self.onos_url), _get_devices(self.onos_url),
+                                          stretch=self.path_stretch)
+        return self.path_engine
+
+    @timed('get_available_actions')
     def get_available_actions(self, device_id, out_port):
         """Selects and performs a reinforcement learning action, i.e. updates a flow in ONOS."""
+        if self.server_actions:
+            self.actions = self.can_qos.actions(device_id, out_port)
+            return
         actions = []
-        alt_paths = set()
+        routes = []
 
-        # Filter src and dst hosts from existing flows
-        action_metrics_tuples = _filter_eth_src_dst_in_out_port_from_flows(device_id)
-        for action_metrics_tuple in action_metrics_tuples:
-            if out_port == action_metrics_tuple[3]:
-                actions.append({'eth_src': action_metrics_tuple[0], 'eth_dst': action_metrics_tuple[1],
-                                'in_port': action_metrics_tuple[2], 'out_port': action_metrics_tuple[3]})
+        # Look up src and dst hosts of the flows leaving the port in the flow table mirror
+        for eth_src, eth_dst, in_port, port in self.flow_table.flows_on_port(device_id, out_port):
+            if eth_src and eth_dst:
+                actions.append({'eth_src': eth_src, 'eth_dst': eth_dst, 'in_port': in_port, 'out_port': port})
 
         for action in actions:
-            eth_dst_switches = _get_switch_connected_to_host(f'{action["eth_dst"]}/None')
+            eth_dst_switches = self.topology_cache.host_locations(f'{action["eth_dst"]}/None')
             for eth_dst_switch in eth_dst_switches:
                 if eth_dst_switch != device_id:
-                    alt_paths.update(_get_alternative_paths_from_switch(device_id, eth_dst_switch))
-        alt_paths = sorted(list(alt_paths))  # list of alternative paths in ascending order
-        alt_paths.remove(out_port)  # remove current path from alternative paths
+                    routes += self._get_path_engine().routes(device_id, eth_dst_switch)
+        alt_paths = rank_ports(routes, out_port)  # alternative paths, shortest and widest first
 
-        actions = [action for action in actions for _ in
-                   range(len(alt_paths))]  # create duplicate elements for alternative ports
-
-        # Updates action metrics with alternative ports
-        for i in range(len(actions) // len(alt_paths)):
-            for j in range(len(alt_paths)):
-                actions[i * len(alt_paths) + j]['out_port'] = alt_paths[j]
-        self.actions = actions
+        # Create one action per flow and alternative port
+        self.actions = [dict(action, out_port=alt_path) for action in actions for alt_path in alt_paths]
 
     def get_reward(self):
         """Returns the reward (or penalty to be correct, since the value is negative)."""
-        reward = 0
-        for state in self.states:
-            reward += state['if_out_utilization']
-        self.reward = -reward
+        self.reward = -self.states.total_utilization()
 
+    @timed('get_states')
     def get_states(self):
-        states = []
-        if_out_utilizations = _get_interface_utilizations()
-        of_dpids = _get_openflow_device_id()
-        of_ports = _get_openflow_port_number()
-
-        for if_out_utilization, of_dpid, of_port in zip(if_out_utilizations.values(), of_dpids.values(),
-                                                        of_ports.values()):
-            states.append({'if_out_utilization': if_out_utilization, 'of_dpid': of_dpid, 'of_port': of_port})
-        self.states = states
+        """Updates the state store with the latest interface utilizations."""
+        if self.collector is not None:
+            self.states = self.collector.snapshot()  # latest streamed sample, no i/o
+            return
+        metrics = self.telemetry.fetch(telemetry_metrics)  # one round trip for all metrics
+        if_out_utilizations = {data_source: (value * 8) / mininet_link_bw
+                               for data_source, value in metrics['ifoutoctets'].items()}
+        self.states.update(if_out_utilizations, metrics['of_dpid'], metrics['of_port'])
+
+    def get_state_window(self, n):
+        """Returns the timestamps and a `(samples, interfaces)` array of the last `n` streamed utilization samples."""
+        return self.collector.window(n)
+
+    @timed('start_scenario')
+    def start_scenario(self, flows, timeout=10, fraction=0.5):
+        """Plays a traffic schedule of `FlowSpec`s on the hosts in the background, replacing the running one.
+
+        Returns once the telemetry shows the load of the flows active at the start, see `wait_for_load`.
+        """
+        self.stop_scenario()
+        self.scenario = ScenarioEngine(self.net, flows).start()
+        return self.wait_for_load(timeout, fraction)
+
+    def stop_scenario(self):
+        """Stops the traffic schedule and kills its iperf flows."""
+        if self.scenario is not None:
+            self.scenario.stop()
+            self.scenario = None
+
+    def wait_for_load(self, timeout=10, fraction=0.5):
+        """Waits until the switch port of every receiving host carries `fraction` of the rate sent to the host.
+
+        The expected rates are those of the flows active when the call is made, capped at the link capacity. Returns
+        whether the load was reached within `timeout` seconds.
+        """
+        expected = {}
+        for server, rate in self.scenario.expected_load().items():
+            device_id, port = self.host_ports[server]
+            capacity = self.link_capacities.get((device_id, port), mininet_link_bw)
+            expected[device_id[len('of:'):], int(port)] = fraction * min(rate * 1_000_000, capacity) / mininet_link_bw
+
+        def loaded(states):
+            return all(states.utilization[(states.dpid == dpid) & (states.port == port)].sum() >= utilization
+                       for (dpid, port), utilization in expected.items())
+
+        return self._wait_for_telemetry(loaded, timeout)
+
+    def _wait_for_telemetry(self, predicate, timeout, fresh=False):
+        """Waits until `predicate(states)` holds for the latest telemetry. Returns False if `timeout` passed first.
+
+        With `fresh` set, streamed samples taken before the call are ignored. Polled samples are always fresh.
+        """
+        if self.collector is not None:
+            return self.collector.wait_until(predicate, timeout, fresh)
+        deadline = time() + timeout
+        while True:
+            self.get_states()
+            if predicate(self.states):
+                return True
+            if time() >= deadline:
+                return False
+            sleep(sflow_polling_interval)  # wait for sflow-rt to poll metrics
+
+    def wait_for_sample(self, timeout=10):
+        """Waits until the telemetry has a sample taken after the call, e.g. one that shows the effect of an action.
+
+        Streamed samples are awaited from the collector, which returns False if none arrived within `timeout`
+        seconds. Polled telemetry is fresh one sFlow-RT polling interval later.
+        """
+        if self.collector is not None:
+            return self.collector.wait_for_samples(1, timeout)
+        sleep(sflow_polling_interval)
+        return True
+
+    def wait_for_congestion(self, timeout=None):
+        """Waits until the can-qos-app reports a congested port. Returns the congested `(device_id, port)`s."""
+        return self.congestion_events.wait_for_congestion(timeout)
 
     def enable_sflow_rt(self, path_to_script='../../sflow-rt/extras/sflow.py'):
         """Enables sFlow-RT by executing helper script sflow.py."""
@@ -193,57 +357,31 @@ class NetworkEnvironment:
         info(f'*** Shutting down\n')
         if halt_execution:
             sleep(20)  # halt execution to ensure sflow-rt has time to poll metrics
-        self.net.stop()
+        self.stop_scenario()
+        if self.collector is not None:
+            self.collector.stop()
+        if self.congestion_events is not None:
+            self.congestion_events.stop()
+        self.flow_table.stop()
+        self.telemetry.close()
+        if self.net is not None:
+            self.net.stop()
 
     def test_one(self, duration=30):
-        """Generates TCP traffic between a client host h1 and server host h2."""
-        h1, h2 = self.net.get('h1', 'h2')
-        info(f'*** Starting iperf server\n')
-        h1.cmd('iperf -s &')
-        sleep(1)  # sleep to prevent connection error using iperf
-        info(f'*** Generating traffic\n')
-        h2.cmd(f'iperf -c {h1.IP()} -b 10m -t{duration} &')
-        info(f'*** Test running as background task\n')
-        sleep(9)  # halt execution to wait for sflow-rt to poll metrics
+        """Generates TCP traffic between a client host h2 and a server host h1."""
+        self.start_scenario(from_traffic_matrix(traffic_matrices['test_one'], duration))
 
     def test_two(self, duration=30):
         """Generates TCP traffic between a client host h1 and a server host h2."""
-        h1, h2 = self.net.get('h1', 'h2')
-        info(f'*** Starting iperf server\n')
-        h2.cmd('iperf -s &')
-        sleep(1)  # sleep to prevent connection error using iperf
-        info('*** Generating traffic\n')
-        h1.cmd(f'iperf -c {h2.IP()} -b 10m -t {duration} &')
-        info(f'*** Test running as background task\n')
-        sleep(9)  # halt execution to wait for sflow-rt to poll metrics
+        self.start_scenario(from_traffic_matrix(traffic_matrices['test_two'], duration))
 
     def test_three(self, duration=30):
-        """Generates TCP traffic between four client hosts h1, h3, respectively, and two server hosts h2 and h4."""
-        h1, h2, h3, h4 = self.net.get('h1', 'h2', 'h3', 'h4')
-        info(f'*** Starting iperf servers\n')
-        h2.cmd('iperf -s &')
-        h4.cmd('iperf -s &')
-        sleep(1)  # sleep to prevent connection error using iperf
-        info('*** Generating traffic\n')
-        h1.cmd(f'iperf -c {h4.IP()} -b 5m -t {duration} &')
-        h3.cmd(f'iperf -c {h2.IP()} -b 5m -t {duration} &')
-        info(f'*** Test running as background task\n')
-        sleep(9)  # halt execution to wait for sflow-rt to poll metrics
+        """Generates TCP traffic between two client hosts h1 and h3 and two server hosts h4 and h2, respectively."""
+        self.start_scenario(from_traffic_matrix(traffic_matrices['test_three'], duration))
 
     def test_four(self, duration=30):
-        """Generates TCP and UDP traffic between four client hosts, h1, h3, h5, and h6, respectively, and two server hosts h2 and h4."""
-        h1, h2, h3, h4, h5, h6 = self.net.get('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
-        info(f'*** Starting iperf servers\n')
-        h2.cmd('iperf -s &')
-        h4.cmd('iperf -s &')
-        sleep(1)  # sleep to prevent connection error using iperf
-        info('*** Generating traffic\n')
-        h1.cmd(f'iperf -c {h4.IP()} -b 10m -t {duration} &')
-        h3.cmd(f'iperf -c {h2.IP()} -b 10m -t {duration} &')
-        h5.cmd(f'iperf -c {h4.IP()} -b 10m -t {duration} &')
-        h6.cmd(f'iperf -c {h4.IP()} -b 10m -t {duration} &')
-        info(f'*** Test running as background task\n')
-        sleep(9)  # halt execution to wait for sflow-rt to poll metrics
+        """Generates TCP traffic between four client hosts, h1, h3, h5, and h6, and two server hosts h2 and h4."""
+        self.start_scenario(from_traffic_matrix(traffic_matrices['test_four'], duration))
 
     # Auxiliary functions used for testing basic functionality -- delete later
     def iperf(self):
@@ -364,7 +502,11 @@ class ONOSController(RemoteController):
 topos = {'topo1': TopoOne,
          'topo2': TopoTwo,
          'topo3': TopoThree,
-         'topo4': TopoFour}
+         'topo4': TopoFour,
+         'fattree': FatTree,
+         'leafspine': LeafSpine,
+         'ring': Ring,
+         'waxman': Waxman}
 
 controllers = {'onos': ONOSController}
 
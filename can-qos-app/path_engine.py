@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+from collections import defaultdict, deque
+
+
+class PathEngine:
+    """Precomputed next-hop table of the switch graph, answering "which egress ports lead to this switch" in O(1).
+
+    For every `(device, destination switch)` pair the table holds one route per egress port that leads towards the
+    destination without passing through `device` again, as `(port, hops, capacity)` where `hops` is the length of
+    the shortest path through that port and `capacity` is the bottleneck capacity of the widest such path.
+    With `stretch=0` only ports on shortest paths are kept, which matches the paths returned by ONOS `/paths`.
+    With `stretch=1` ports towards neighbours at the same distance from the destination, i.e. one hop longer, are
+    kept as well; larger values are treated as 1 since they could route traffic back through `device`.
+    """
+
+    def __init__(self, links, devices=(), stretch=0):
+        self.stretch = stretch
+        self.devices = set(devices)
+        self._neighbours = defaultdict(list)  # device -> [(src port, neighbour, capacity)]
+        self._predecessors = defaultdict(list)  # device -> [devices with a link to it]
+        for src_device, src_port, dst_device, dst_port, capacity in links:
+            self.devices.update((src_device, dst_device))
+            self._neighbours[src_device].append((src_port, dst_device, capacity))
+            self._predecessors[dst_device].append(src_device)
+        self.table = {}
+        for dst in self.devices:
+            self._add_routes_to(dst)
+
+    def _add_routes_to(self, dst):
+        # Breadth-first search from the destination over reversed links gives every device's distance to it
+        distance = {dst: 0}
+        order = [dst]
+        queue = deque([dst])
+        while queue:
+            device = queue.popleft()
+            for predecessor in self._predecessors[device]:
+                if predecessor not in distance:
+                    distance[predecessor] = distance[device] + 1
+                    order.append(predecessor)
+                    queue.append(predecessor)
+
+        # Widest shortest path from every device, in order of increasing distance
+        width = {dst: float('inf')}
+        for device in order[1:]:
+            width[device] = max(min(capacity, width[neighbour]) for _, neighbour, capacity in
+                                self._neighbours[device] if distance.get(neighbour) == distance[device] - 1)
+
+        for device in order[1:]:
+            routes = []
+            for port, neighbour, capacity in self._neighbours[device]:
+                if neighbour in distance and distance[neighbour] - distance[device] < min(self.stretch, 1):
+                    routes.append((port, distance[neighbour] + 1, min(capacity, width[neighbour])))
+            self.table[device, dst] = tuple(sorted(routes, key=lambda route: (route[1], -route[2])))
+
+    def routes(self, device, dst):
+        """Returns the `(port, hops, capacity)` routes from `device` to `dst`, shortest and widest first."""
+        return self.table.get((device, dst), ())
+
+    def alternative_ports(self, device, dst):
+        """Returns the egress ports of `device` that lead to `dst`."""
+        return [route[0] for route in self.routes(device, dst)]
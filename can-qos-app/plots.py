@@ -1,43 +1,130 @@
 #!/usr/bin/env python
+import matplotlib
+matplotlib.use('Agg')  # render to files without a display
+import numpy as np
 from matplotlib import pyplot as plt
-
-# TODO: Write data to files used to generate plots
+from recorder import RecordedRun
 
 
 # Auxiliary functions used to generates plots
-def generate_link_utilization_plot(json_data, threshold=0.25):
-    """Parses JSON data and plots the interface utilization against time steps for generated traffic."""
-    parsed_data = {}
-    plot_interface = {}
-
-    # Initialize parsed_data
+def _parse_json(json_data):
+    """Returns a `(time steps, interfaces)` array and the interface names of a list of per time step interface lists."""
+    columns = {}
     for time_step in json_data:
         for interface in time_step:
-            parsed_data[interface['interface_name']] = {}
-            plot_interface[interface['interface_name']] = False
-    for key, _ in parsed_data.items():
-        for time_step in range(len(json_data)):
-            parsed_data[key][time_step] = 0.0
-
-    # Populate parsed_data
+            columns.setdefault(interface['interface_name'], len(columns))
+    data = np.zeros((len(json_data), len(columns)))
     for idx, time_step in enumerate(json_data):
         for interface in time_step:
-            parsed_data[interface['interface_name']][idx] = interface['utilization']
-            if interface['utilization'] > threshold:
-                plot_interface[interface['interface_name']] = True
+            data[idx, columns[interface['interface_name']]] = interface['utilization']
+    return data, list(columns)
+
+
+def _blocks(data, block_rows):
+    """Yields consecutive `(time steps, interfaces)` blocks of at most `block_rows` rows of one or more arrays."""
+    for array in data:
+        for start in range(0, len(array), block_rows):
+            yield np.asarray(array[start:start + block_rows], dtype=np.float64)
+
+
+def _reduce(data, threshold, bucket, n_interfaces):
+    """Scans the data once, returning whether each interface exceeds `threshold` and its min/max per `bucket` steps.
+
+    Returns `(above, steps, minima, maxima)` where `minima` and `maxima` are `(values, time steps)` pairs of arrays
+    with one row per bucket of time steps, holding each bucket's extremes and the steps they occurred at.
+    """
+    above = np.zeros(n_interfaces, dtype=bool)
+    minima, minima_at, maxima, maxima_at = [], [], [], []
+    steps = 0
+    carry = np.zeros((0, n_interfaces))  # rows of an incomplete bucket at the end of the previous block
+    for block in data:
+        above |= (block > threshold).any(axis=0)
+        first = steps - len(carry)  # time step of the first row of the carry and block
+        steps += len(block)
+        block = np.concatenate([carry, block])
+        full = len(block) - len(block) % bucket
+        buckets = block[:full].reshape(-1, bucket, n_interfaces)
+        starts = first + np.arange(len(buckets))[:, None] * bucket
+        minima.append(buckets.min(axis=1))
+        minima_at.append(starts + buckets.argmin(axis=1))
+        maxima.append(buckets.max(axis=1))
+        maxima_at.append(starts + buckets.argmax(axis=1))
+        carry = block[full:]
+    if len(carry):
+        minima.append(carry.min(axis=0, keepdims=True))
+        minima_at.append(steps - len(carry) + carry.argmin(axis=0, keepdims=True))
+        maxima.append(carry.max(axis=0, keepdims=True))
+        maxima_at.append(steps - len(carry) + carry.argmax(axis=0, keepdims=True))
+    if not minima:
+        empty = (np.zeros((0, n_interfaces)), np.zeros((0, n_interfaces), dtype=np.int64))
+        return above, steps, empty, empty
+    return (above, steps, (np.concatenate(minima), np.concatenate(minima_at)),
+            (np.concatenate(maxima), np.concatenate(maxima_at)))
+
+
+def _decimate(minima, maxima):
+    """Returns the time steps and values of the minimum and maximum of every bucket, in the order they occurred.
+
+    Both are `(2 * buckets, interfaces)` arrays, since every interface has its own order. An empty series is
+    returned unchanged.
+    """
+    (min_values, min_at), (max_values, max_at) = minima, maxima
+    if not len(min_values):
+        return min_at, min_values
+    min_first = min_at <= max_at
+    time_steps = np.stack([np.where(min_first, min_at, max_at), np.where(min_first, max_at, min_at)], axis=1)
+    values = np.stack([np.where(min_first, min_values, max_values), np.where(min_first, max_values, min_values)],
+                      axis=1)
+    return time_steps.reshape(-1, min_at.shape[1]), values.reshape(-1, min_values.shape[1])
+
+
+def generate_link_utilization_plot(data, threshold=0.25, output_path='link_utilization.png', interface_names=None,
+                                   max_points=2000, block_rows=65536, env=0):
+    """Plots the utilization against time steps of every interface that exceeds `threshold`, and saves it to a file.
+
+    `data` is a `(time steps, interfaces)` array, a `RecordedRun` (of which environment `env` is plotted) or the
+    legacy list of per time step `{'interface_name', 'utilization'}` lists. The data is read in blocks of
+    `block_rows` steps, so memory-mapped runs are never loaded whole. Runs longer than `max_points` steps are
+    decimated to the minimum and maximum of each bucket of steps, which keeps utilization peaks visible.
+    """
+    if isinstance(data, RecordedRun):
+        interface_names = interface_names or data.interface_names
+        arrays = list(data.utilization_segments(env))
+        n_interfaces = data.state_dim
+    elif isinstance(data, list):
+        data, json_names = _parse_json(data)
+        interface_names = interface_names or json_names
+        arrays = [data]
+        n_interfaces = data.shape[1]
+    else:
+        arrays = [data]
+        n_interfaces = data.shape[1]
+    steps = sum(len(array) for array in arrays)
+    bucket = max(1, -(-steps // max(1, max_points // 2)))
+    above, steps, minima, maxima = _reduce(_blocks(arrays, block_rows), threshold, bucket, n_interfaces)
+    interface_names = list(interface_names or ())
+    interface_names += [f'interface {i}' for i in range(len(interface_names), len(above))]  # unmapped columns
+
+    # Interleave the minimum and maximum of each bucket at the steps they occurred at
+    if bucket == 1:
+        time_steps, values = minima[1], minima[0]
+    else:
+        time_steps, values = _decimate(minima, maxima)
 
-    # Generate plot
     fig, ax = plt.subplots(figsize=(10, 4), dpi=80)
-    for interface in [*parsed_data.keys()]:
-        if plot_interface[interface]:
-            ax.plot([*parsed_data[interface].keys()], [*parsed_data[interface].values()], linewidth=2, label=interface)
+    for column in np.flatnonzero(above):
+        ax.plot(time_steps[:, column], values[:, column], linewidth=2 if bucket == 1 else 1,
+                label=interface_names[column])
     ax.spines['right'].set_visible(False)
     ax.spines['top'].set_visible(False)
-    ax.set_xlim(0, 50)  # change upper limit as needed
+    ax.set_xlim(0, max(steps - 1, 1))
     ax.set_ylim(0, 1)
     ax.grid(axis='y', color='w')
     ax.set_xlabel('Time Steps [seconds]')
     ax.set_ylabel('Interface Utilization')
     ax.set_facecolor('#f1f1f2')
-    ax.legend()
-    ax.show()
+    if above.any():
+        ax.legend()
+    fig.savefig(output_path, bbox_inches='tight')
+    plt.close(fig)
+    return output_path
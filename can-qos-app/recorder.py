@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+import json
+import os
+import queue
+import threading
+from time import time
+import numpy as np
+
+
+def _columns(observation_dim, n_actions):
+    """Returns `{column: (dtype, shape of one row)}` of a recorded run."""
+    return {'timestamp': (np.float64, ()), 'episode': (np.int32, ()), 'env': (np.int32, ()),
+            'observation': (np.float32, (observation_dim,)), 'mask': (np.bool_, (n_actions,)),
+            'action': (np.int64, ()), 'reward': (np.float32, ())}
+
+
+def interface_name(of_dpid, of_port):
+    """Returns the Mininet name of a switch interface, e.g. `s3-eth2`, from its OpenFlow device ID and port."""
+    return f's{int(of_dpid, 16)}-eth{of_port}'
+
+
+class EpisodeRecorder:
+    """Appends every step of a run to a directory of columnar `.npy` segments without blocking the control loop.
+
+    Steps are handed to a writer thread through a queue. The writer fills preallocated chunks of `chunk_size` rows
+    and saves a chunk as one segment directory with one `.npy` file per column once the next step no longer fits, then
+    lists it in `manifest.json`. All environments of a step are kept in the same segment. Only complete segments are
+    listed, so a run can be loaded while it is still being recorded.
+    Row `t` holds the observation at step `t`, the action taken and the reward received after it.
+
+    The manifest maps every column of the state vector to the `(of_dpid, of_port)` of its interface in
+    `interfaces`, and names it in `interface_names`, by default after the Mininet interface. Interfaces that appear
+    after the recorder was created are added from the `interfaces` passed to `record`.
+    """
+
+    def __init__(self, root, state_dim, observation_dim, n_actions=4, chunk_size=4096, interface_names=None,
+                 interfaces=()):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.columns = _columns(observation_dim, n_actions)
+        self.manifest = {'state_dim': state_dim, 'observation_dim': observation_dim, 'n_actions': n_actions,
+                         'interfaces': [], 'interface_names': list(interface_names or ()), 'segments': []}
+        self._add_interfaces(interfaces)
+        os.makedirs(root, exist_ok=True)
+        self._chunk = {name: np.zeros((chunk_size, *shape), dtype=dtype) for name, (dtype, shape) in
+                       self.columns.items()}
+        self._rows = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='episode-recorder', daemon=True)
+        self._thread.start()
+
+    def record(self, episode, observations, masks, actions, rewards, timestamp=None, interfaces=None):
+        """Records one step of N environments from `(N, ...)` arrays. Returns immediately.
+
+        `interfaces` lists the `(of_dpid, of_port)` of the rows of the state vector, in order, if they changed.
+        """
+        self._queue.put((time() if timestamp is None else timestamp, episode, np.array(observations),
+                         np.array(masks), np.array(actions), np.array(rewards), interfaces))
+
+    def _add_interfaces(self, interfaces):
+        """Maps the columns not mapped yet to `interfaces`, since rows of the state store never move."""
+        mapped = self.manifest['interfaces']
+        mapped += [[str(of_dpid), str(of_port)] for of_dpid, of_port in interfaces[len(mapped):]]
+        names = self.manifest['interface_names']
+        names += [interface_name(*interface) for interface in mapped[len(names):]]
+
+    def _run(self):
+        while True:
+            step = self._queue.get()
+            if step is None:
+                break
+            self._write(*step)
+        self._flush()
+
+    def _write(self, timestamp, episode, observations, masks, actions, rewards, interfaces):
+        if interfaces is not None:
+            self._add_interfaces(interfaces)
+        if self._rows + len(actions) > self.chunk_size:
+            self._flush()  # keep all environments of a step in the same segment
+        for env in range(len(actions)):
+            row = self._rows
+            self._chunk['timestamp'][row] = timestamp
+            self._chunk['episode'][row] = episode
+            self._chunk['env'][row] = env
+            self._chunk['observation'][row] = observations[env]
+            self._chunk['mask'][row] = masks[env]
+            self._chunk['action'][row] = actions[env]
+            self._chunk['reward'][row] = rewards[env]
+            self._rows += 1
+
+    def _flush(self):
+        if not self._rows:
+            return
+        name = f'segment-{len(self.manifest["segments"]):06d}'
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        for column, values in self._chunk.items():
+            np.save(os.path.join(path, f'{column}.npy'), values[:self._rows])
+        self.manifest['segments'].append({'name': name, 'rows': self._rows})
+        with open(os.path.join(self.root, 'manifest.json.tmp'), 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(os.path.join(self.root, 'manifest.json.tmp'), os.path.join(self.root, 'manifest.json'))
+        self._rows = 0
+
+    def close(self):
+        """Writes the remaining steps and waits for the writer to finish."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class RecordedRun:
+    """A recorded run whose segments are memory-mapped, so loading it copies nothing until columns are combined."""
+
+    def __init__(self, root):
+        with open(os.path.join(root, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        self.state_dim = self.manifest['state_dim']
+        self.interfaces = [tuple(interface) for interface in self.manifest.get('interfaces', [])]
+        self.interface_names = self.manifest['interface_names']  # None or partial in runs recorded without them
+        self.segments = [{column: np.load(os.path.join(root, segment['name'], f'{column}.npy'), mmap_mode='r')
+                          for column in _columns(1, 1)} for segment in self.manifest['segments']]
+
+    def __len__(self):
+        return sum(segment['rows'] for segment in self.manifest['segments'])
+
+    def column(self, name):
+        """Returns a column of the whole run, a memory map if the run has one segment and a copy otherwise."""
+        if len(self.segments) == 1:
+            return self.segments[0][name]
+        return np.concatenate([segment[name] for segment in self.segments])
+
+    def utilization_segments(self, env=0):
+        """Yields the `(steps, interfaces)` utilizations seen by one environment, as a memory-mapped view per segment."""
+        for segment in self.segments:
+            n_envs = int(segment['env'].max()) + 1  # every step records all environments in order
+            yield segment['observation'][env::n_envs, :self.state_dim]
+
+    def utilizations(self, env=0):
+        """Returns the `(steps, interfaces)` utilizations seen by one environment of the run."""
+        segments = list(self.utilization_segments(env))
+        return segments[0] if len(segments) == 1 else np.concatenate(segments)
+
+    def seed_replay_buffer(self, buffer):
+        """Adds every recorded transition to a replay buffer and returns how many were added."""
+        added = 0
+        previous = None  # last row of the previous segment
+        for segment in self.segments:
+            columns = {name: segment[name] for name in ('episode', 'env', 'observation', 'mask', 'action', 'reward')}
+            if previous is not None:
+                columns = {name: np.concatenate([previous[name], values]) for name, values in columns.items()}
+            # A step's successor is the next step of the same environment in the same episode
+            n_envs = int(columns['env'].max()) + 1
+            current, following = slice(0, -n_envs), slice(n_envs, None)
+            valid = ((columns['episode'][current] == columns['episode'][following]) &
+                     (columns['env'][current] == columns['env'][following]))
+            buffer.add(columns['observation'][current][valid], columns['action'][current][valid],
+                       columns['reward'][current][valid], columns['observation'][following][valid],
+                       columns['mask'][following][valid])
+            added += int(valid.sum())
+            previous = {name: values[-n_envs:] for name, values in columns.items()}
+        return added
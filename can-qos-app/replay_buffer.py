@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+import threading
+import numpy as np
+
+
+class ReplayBuffer:
+    """Preallocated experience replay buffer with optional proportional prioritized sampling.
+
+    Transitions are stored in fixed-size NumPy arrays that are overwritten oldest first once `capacity` is reached.
+    With `prioritized=True` transitions are sampled with probability proportional to `priority ** alpha` and
+    weighted by importance-sampling weights `(size * probability) ** -beta`, normalized to at most 1.
+    All methods can be called from several threads, e.g. actors adding transitions while a learner samples.
+    """
+
+    def __init__(self, capacity, observation_dim, n_actions, prioritized=False, alpha=0.6, beta=0.4, seed=None):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.rng = np.random.default_rng(seed)
+        self.observations = np.zeros((capacity, observation_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_observations = np.zeros((capacity, observation_dim), dtype=np.float32)
+        self.next_masks = np.zeros((capacity, n_actions), dtype=bool)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.priorities = np.zeros(capacity)
+        self.size = 0
+        self.position = 0  # row the next transition is written to
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def add(self, observations, actions, rewards, next_observations, next_masks, dones=None):
+        """Adds a batch of transitions, one per row of the given arrays."""
+        n = len(actions)
+        with self.lock:
+            rows = np.arange(self.position, self.position + n) % self.capacity
+            self.observations[rows] = observations
+            self.actions[rows] = actions
+            self.rewards[rows] = rewards
+            self.next_observations[rows] = next_observations
+            self.next_masks[rows] = next_masks
+            self.dones[rows] = 0.0 if dones is None else dones
+            self.priorities[rows] = self.priorities[:self.size].max() if self.size else 1.0  # new ones go first
+            self.position = (self.position + n) % self.capacity
+            self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size):
+        """Returns a dict with a random batch of transitions, their `indices` and importance-sampling `weights`."""
+        with self.lock:
+            return self._sample(batch_size)
+
+    def _sample(self, batch_size):
+        if self.prioritized:
+            probabilities = self.priorities[:self.size] ** self.alpha
+            probabilities /= probabilities.sum()
+            indices = self.rng.choice(self.size, batch_size, p=probabilities)
+            weights = (self.size * probabilities[indices]) ** -self.beta
+            weights /= weights.max()
+        else:
+            indices = self.rng.integers(0, self.size, batch_size)
+            weights = np.ones(batch_size)
+        return {'observations': self.observations[indices], 'actions': self.actions[indices],
+                'rewards': self.rewards[indices], 'next_observations': self.next_observations[indices],
+                'next_masks': self.next_masks[indices], 'dones': self.dones[indices],
+                'indices': indices, 'weights': weights.astype(np.float32)}
+
+    def update_priorities(self, indices, td_errors, epsilon=1e-3):
+        """Sets the priorities of sampled transitions to their absolute TD errors."""
+        with self.lock:
+            self.priorities[indices] = np.abs(td_errors) + epsilon
@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+import requests
+from requests.adapters import HTTPAdapter
+from instrumentation import metrics
+
+
+def create_session(auth=None, pool_maxsize=10, client='rest'):
+    """Returns a session that keeps connections to a REST API alive and shares them between threads.
+
+    Calls are counted under `client` in the shared metrics registry while instrumentation is enabled.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if auth is not None:
+        session.auth = auth
+    session.hooks['response'].append(metrics.response_hook(client))
+    return session
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+import numpy as np
+from network_environment import TopoThree, dpid_from_name, mininet_link_bw, rank_ports
+from path_engine import PathEngine
+from state_store import StateStore
+from traffic_scenarios import from_traffic_matrix, segments, traffic_matrices
+
+
+def _max_min_fair_rates(routes, demands, capacities):
+    """Returns the max-min fair rate of every flow given a `(flows, interfaces)` incidence matrix of their routes.
+
+    This is the steady state TCP flows converge to: every flow gets its demand unless it crosses a saturated
+    interface, in which case it gets an equal share of what is left on that interface.
+    """
+    rates = np.zeros(len(demands))
+    remaining = capacities.astype(np.float64)
+    unfrozen = demands > 0
+    while unfrozen.any():
+        n_flows = routes[unfrozen].sum(axis=0)  # unfrozen flows per interface
+        used = n_flows > 0
+        share = np.min(remaining[used] / n_flows[used]) if used.any() else np.inf
+        delta = min(share, np.min(demands[unfrozen] - rates[unfrozen]))
+        rates[unfrozen] += delta
+        remaining -= delta * n_flows
+        saturated = used & (remaining <= 1e-9 * capacities)
+        unfrozen &= (rates < demands - 1e-9) & ~routes[:, saturated].any(axis=1)
+    return rates
+
+
+class SimulatedNetworkEnvironment:
+    """Flow-level simulation of a Mininet topology with the interface of `NetworkEnvironment`.
+
+    Switches forward traffic like ONOS reactive forwarding: the first packet of a flow installs `(in_port, eth_src,
+    eth_dst)` rules along a shortest path, and flows installed by `perform_action` take precedence over those. Link
+    utilizations are computed analytically from the max-min fair rates of the active iperf flows, so a step costs
+    microseconds instead of a telemetry interval, and no root, Mininet network, ONOS or sFlow-RT is needed.
+    """
+
+    def __init__(self, topo=None, interval=1.0, rate_jitter=0.0, seed=None, path_stretch=0):
+        self.topo = topo if topo is not None else TopoThree()
+        self.interval = interval  # simulated seconds that pass between two `get_states` calls
+        self.rate_jitter = rate_jitter  # relative standard deviation of the flow rates between steps
+        self.rng = np.random.default_rng(seed)
+        self.time = 0.0
+        self._build(path_stretch)
+        self.reset()
+
+    def _build(self, path_stretch):
+        self.host_macs = {}
+        self.host_locations = {}  # host -> (device_id, port) of its switch interface
+        self._peers = {}  # (device_id, port) -> (neighbour device_id, neighbour port)
+        interfaces = []  # (dpid, port, capacity) of every switch interface
+        links = []
+        for node1, node2, link_info in self.topo.links(withInfo=True):
+            capacity = link_info.get('bw', mininet_link_bw / 1_000_000) * 1_000_000
+            ends = ((node1, str(link_info['port1'])), (node2, str(link_info['port2'])))
+            for (node, port), (peer, peer_port) in (ends, ends[::-1]):
+                if not self.topo.isSwitch(node):
+                    self.host_macs[node] = self.topo.nodeInfo(node)['mac']
+                    self.host_locations[node] = (f'of:{dpid_from_name(peer)}', peer_port)
+                    continue
+                device_id = f'of:{dpid_from_name(node)}'
+                interfaces.append((dpid_from_name(node), port, capacity))
+                if self.topo.isSwitch(peer):
+                    self._peers[device_id, port] = (f'of:{dpid_from_name(peer)}', peer_port)
+                    links.append((device_id, port, f'of:{dpid_from_name(peer)}', peer_port, capacity))
+        self.mac_hosts = {mac: host for host, mac in self.host_macs.items()}
+        self.path_engine = PathEngine(links, {f'of:{dpid_from_name(s)}' for s in self.topo.switches()},
+                                      stretch=path_stretch)
+
+        interfaces.sort(key=lambda interface: (interface[0], int(interface[1])))
+        self.state_dim = len(interfaces)
+        self.link_capacities = {(f'of:{dpid}', port): capacity for dpid, port, capacity in interfaces}
+        self._rows = {(f'of:{dpid}', port): row for row, (dpid, port, _) in enumerate(interfaces)}
+        self._capacities = np.array([capacity for _, _, capacity in interfaces])
+        self._data_sources = {f'{dpid}-{port}': (dpid, port) for dpid, port, _ in interfaces}
+
+    def reset(self):
+        """Stops all traffic and removes all installed flows. Returns True, as the network settles at once."""
+        self.fwd_flows = {}  # device_id -> {(eth_src, eth_dst, in_port): out_port} installed by reactive forwarding
+        self.app_flows = {}  # device_id -> {(eth_src, eth_dst, in_port): out_port} installed by `perform_action`
+        self.flows = []  # scheduled traffic as [src host, dst host, rate in bit/s, start time, end time]
+        self._routes = None
+        self._active = None  # indices of the flows `_routes` was built for
+        self.states = StateStore()
+        self.states.update({s: 0.0 for s in self._data_sources}, {s: d for s, (d, _) in self._data_sources.items()},
+                           {s: p for s, (_, p) in self._data_sources.items()})
+        self.actions = []
+        self.reward = 0.0
+        return True
+
+    def _install_fwd_path(self, src, dst, device_id=None, in_port=None):
+        """Installs reactive forwarding rules along a shortest path from host `src`, or a switch port, to host `dst`."""
+        if device_id is None:
+            device_id, in_port = self.host_locations[src]
+        dst_device_id, dst_port = self.host_locations[dst]
+        match = (self.host_macs[src], self.host_macs[dst])
+        for _ in range(len(self.path_engine.devices)):
+            table = self.fwd_flows.setdefault(device_id, {})
+            if device_id == dst_device_id:
+                table.setdefault((*match, in_port), dst_port)
+                return
+            out_port = table.get((*match, in_port)) or self.path_engine.alternative_ports(device_id, dst_device_id)[0]
+            table[(*match, in_port)] = out_port
+            device_id, in_port = self._peers[device_id, out_port]
+
+    def _route(self, src, dst):
+        """Returns the rows of the interfaces a flow from host `src` to host `dst` leaves switches through."""
+        rows = []
+        device_id, in_port = self.host_locations[src]
+        match = (self.host_macs[src], self.host_macs[dst])
+        visited = set()
+        while (device_id, in_port) not in visited:  # a loop keeps consuming bandwidth, but is only counted once
+            visited.add((device_id, in_port))
+            key = (*match, in_port)
+            out_port = self.app_flows.get(device_id, {}).get(key) or self.fwd_flows.get(device_id, {}).get(key)
+            if out_port is None:  # the first packet on a new path is forwarded to onos, which installs rules
+                self._install_fwd_path(src, dst, device_id, in_port)
+                out_port = self.fwd_flows[device_id][key]
+            rows.append(self._rows[device_id, out_port])
+            if (device_id, out_port) not in self._peers:
+                break  # delivered to a host
+            device_id, in_port = self._peers[device_id, out_port]
+        return rows
+
+    def start_traffic(self, traffic_matrix, duration=30):
+        """Starts `(client, server, rate in Mbit/s)` flows that stop after `duration` simulated seconds."""
+        self.start_scenario(from_traffic_matrix(traffic_matrix, duration))
+
+    def start_scenario(self, flows, timeout=None, fraction=None):
+        """Schedules the `FlowSpec`s of a traffic schedule, with times in simulated seconds from now.
+
+        The load of the flows shows in the next `get_states`, so the scenario is ready at once and `timeout` and
+        `fraction` only exist for compatibility with `NetworkEnvironment.start_scenario`.
+        """
+        for segment in segments(flows):
+            self._install_fwd_path(segment.client, segment.server)
+            self._install_fwd_path(segment.server, segment.client)  # acknowledgements flow in the opposite direction
+            self.flows.append([segment.client, segment.server, segment.rate * 1_000_000, self.time + segment.start,
+                               self.time + segment.end])
+        self._routes = None
+        return True
+
+    def stop_scenario(self):
+        """Stops all traffic."""
+        self.flows = []
+        self._routes = None
+
+    def _utilizations(self):
+        flows = [flow for flow in self.flows if flow[4] > self.time]
+        if len(flows) != len(self.flows):
+            self.flows, self._routes = flows, None  # indices in `_active` moved
+        active = [i for i, flow in enumerate(self.flows) if flow[3] <= self.time]
+        if self._routes is None or active != self._active:
+            self._active = active
+            self._routes = np.zeros((len(active), self.state_dim), dtype=bool)
+            for i, flow in enumerate(self.flows[j] for j in active):
+                self._routes[i, self._route(flow[0], flow[1])] = True
+        demands = np.array([self.flows[i][2] for i in active])
+        if self.rate_jitter:
+            demands = np.maximum(demands * (1 + self.rate_jitter * self.rng.standard_normal(len(demands))), 0)
+        rates = _max_min_fair_rates(self._routes, demands, self._capacities)
+        return (rates @ self._routes) / self._capacities
+
+    def get_states(self):
+        """Advances the simulation by one telemetry interval and updates the state store."""
+        self.time += self.interval
+        self.states.utilization[:] = self._utilizations()  # rows are sorted by (dpid, port) like the store's
+
+    def wait_for_sample(self, timeout=None):
+        """Returns True at once, as every `get_states` advances the simulation to a new sample."""
+        return True
+
+    def get_available_actions(self, device_id, out_port):
+        """Lists the reroutes of the forwarded flows leaving `device_id` through `out_port`."""
+        device_id = device_id if device_id.startswith('of:') else f'of:{device_id}'
+        actions = []
+        routes = []
+        for (eth_src, eth_dst, in_port), port in self.fwd_flows.get(device_id, {}).items():
+            if port == out_port:
+                actions.append({'eth_src': eth_src, 'eth_dst': eth_dst, 'in_port': in_port, 'out_port': port})
+        for action in actions:
+            eth_dst_switch = self.host_locations[self.mac_hosts[action['eth_dst']]][0]
+            if eth_dst_switch != device_id:
+                routes += self.path_engine.routes(device_id, eth_dst_switch)
+        alt_paths = rank_ports(routes, out_port)
+        self.actions = [dict(action, out_port=alt_path) for action in actions for alt_path in alt_paths]
+
+    def perform_action(self, device_id, out_port, in_port, eth_dst, eth_src):
+        """Reroutes the flow from `eth_src` to `eth_dst` entering `in_port` of a device out of `out_port`."""
+        return self.perform_actions([(device_id, in_port, out_port, eth_src, eth_dst)])[0]
+
+    def perform_actions(self, reroutes):
+        """Installs a list of `(device_id, in_port, out_port, eth_src, eth_dst)` reroutes."""
+        statuses = []
+        for device_id, in_port, out_port, eth_src, eth_dst in reroutes:
+            device_id = device_id if device_id.startswith('of:') else f'of:{device_id}'
+            self.app_flows.setdefault(device_id, {})[eth_src, eth_dst, str(in_port)] = str(out_port)
+            statuses.append({'device_id': device_id, 'flow_id': None, 'status': 200})
+        self._routes = None
+        return statuses
+
+    def get_reward(self):
+        """Returns the reward (or penalty to be correct, since the value is negative)."""
+        self.reward = -self.states.total_utilization()
+
+    def cleanup(self, halt_execution=False):
+        self.reset()
+
+    def test_one(self, duration=30):
+        self.start_traffic(traffic_matrices['test_one'], duration)
+
+    def test_two(self, duration=30):
+        self.start_traffic(traffic_matrices['test_two'], duration)
+
+    def test_three(self, duration=30):
+        self.start_traffic(traffic_matrices['test_three'], duration)
+
+    def test_four(self, duration=30):
+        self.start_traffic(traffic_matrices['test_four'], duration)
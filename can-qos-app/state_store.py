@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+import numpy as np
+
+
+def _port_number(port):
+    """Returns an OpenFlow port as an integer, or -1 for ports without a number (e.g. `LOCAL`)."""
+    try:
+        return int(port)
+    except (TypeError, ValueError):
+        return -1
+
+
+class StateStore:
+    """Interface state of the network with one row per interface, keyed by the sFlow-RT `dataSource`.
+
+    Rows are assigned the first time an interface is seen and never move afterwards, so the same interface is
+    always found at the same position of `utilization`, `dpid` and `port`.
+    """
+
+    def __init__(self):
+        self.index = {}  # dataSource -> row
+        self.utilization = np.zeros(0)
+        self.dpid = np.zeros(0, dtype='<U16')
+        self.port = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __repr__(self):
+        return repr(self.to_dicts())
+
+    def _add_interfaces(self, data_sources, dpids, ports):
+        new = sorted(data_sources, key=lambda data_source: (dpids[data_source], _port_number(ports[data_source])))
+        for row, data_source in enumerate(new, start=len(self.index)):
+            self.index[data_source] = row
+        self.utilization = np.concatenate([self.utilization, np.zeros(len(new))])
+        self.dpid = np.concatenate([self.dpid, np.array([dpids[s] for s in new], dtype='<U16')])
+        self.port = np.concatenate([self.port, np.array([_port_number(ports[s]) for s in new], dtype=np.int64)])
+
+    def update(self, utilizations, dpids, ports):
+        """Joins the metric dumps `{dataSource: value}` on `dataSource` and writes them to the store.
+
+        Interfaces missing from one of the dumps are skipped, and interfaces missing from all of them read as idle.
+        """
+        data_sources = [s for s in utilizations if s in dpids and s in ports]
+        new = [s for s in data_sources if s not in self.index]
+        if new:
+            self._add_interfaces(new, dpids, ports)
+        rows = np.fromiter((self.index[s] for s in data_sources), dtype=np.int64, count=len(data_sources))
+        self.utilization[:] = 0.0
+        self.utilization[rows] = np.fromiter((utilizations[s] for s in data_sources), dtype=np.float64,
+                                             count=len(data_sources))
+
+    def vector(self, size=None):
+        """Returns the utilizations as a `float32` array, zero-padded or truncated to `size` if given."""
+        if size is None:
+            return self.utilization.astype(np.float32)
+        vector = np.zeros(size, dtype=np.float32)
+        n = min(size, len(self.utilization))
+        vector[:n] = self.utilization[:n]
+        return vector
+
+    def congested(self, threshold, excluded_ports=(0, 1)):
+        """Returns the rows of the interfaces above `threshold`, most utilized first."""
+        mask = (self.utilization > threshold) & ~np.isin(self.port, excluded_ports)
+        rows = np.flatnonzero(mask)
+        return rows[np.argsort(-self.utilization[rows], kind='stable')]
+
+    def interface(self, row):
+        """Returns `(of_dpid, of_port)` of the interface in `row`, in the string format used by ONOS."""
+        return str(self.dpid[row]), str(self.port[row])
+
+    def total_utilization(self):
+        return float(self.utilization.sum())
+
+    def copy(self):
+        store = StateStore()
+        store.index = dict(self.index)
+        store.utilization = self.utilization.copy()
+        store.dpid = self.dpid.copy()
+        store.port = self.port.copy()
+        return store
+
+    def to_dicts(self):
+        """Returns the states as the list of `{'if_out_utilization', 'of_dpid', 'of_port'}` dicts used for printing."""
+        return [{'if_out_utilization': float(u), 'of_dpid': str(d), 'of_port': str(p)}
+                for u, d, p in zip(self.utilization, self.dpid, self.port)]
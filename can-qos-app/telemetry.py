@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import metrics
+from rest import create_session
+
+
+def _group_by_data_source(data):
+    """Maps the `dataSource` of each entry in an sFlow-RT dump to its metric value."""
+    return {entry['dataSource']: entry['metricValue'] for entry in data}
+
+
+class TelemetryClient:
+    """Fetches sFlow-RT metrics over a single persistent, pooled HTTP session."""
+
+    def __init__(self, sflow_rt_url, agent='TOPOLOGY', multi_metric=True, max_workers=4, timeout=5):
+        self.sflow_rt_url = sflow_rt_url
+        self.agent = agent
+        self.multi_metric = multi_metric  # fetch all metrics in one query instead of one query per metric
+        self.timeout = timeout
+        self.session = create_session(pool_maxsize=max_workers, client='sflow-rt')
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def fetch_metric(self, metric):
+        """Returns the raw sFlow-RT dump of a metric, or of a `;` separated list of metrics."""
+        r = self.session.get(f'{self.sflow_rt_url}/dump/{self.agent}/{metric}/json', timeout=self.timeout)
+        r.raise_for_status()
+        with metrics.span('telemetry_parse'):
+            return r.json()
+
+    def fetch_concurrent(self, metric_names):
+        """Fetches each metric with its own request, all requests in flight at the same time."""
+        futures = {metric: self.executor.submit(self.fetch_metric, metric) for metric in metric_names}
+        return {metric: _group_by_data_source(future.result()) for metric, future in futures.items()}
+
+    def fetch_multi(self, metric_names):
+        """Fetches all metrics in a single multi-metric query."""
+        output = {metric: {} for metric in metric_names}
+        for entry in self.fetch_metric(';'.join(metric_names)):
+            if entry.get('metricName') in output:
+                output[entry['metricName']][entry['dataSource']] = entry['metricValue']
+        return output
+
+    def fetch(self, metric_names):
+        """Returns `{metric: {dataSource: value}}` for every metric in `metric_names`."""
+        if self.multi_metric:
+            return self.fetch_multi(metric_names)
+        return self.fetch_concurrent(metric_names)
+
+    def close(self):
+        """Shuts down the worker threads and closes the pooled connections."""
+        self.executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+import socket
+import struct
+import threading
+from time import monotonic, time
+import numpy as np
+import requests
+from mininet.log import info
+from state_store import StateStore
+
+
+class RingBuffer:
+    """Preallocated buffer holding the last `capacity` samples of up to `width` values each.
+
+    Shorter samples are zero-padded. `grow` widens the buffer, since appending a sample wider than the buffer
+    raises instead of dropping values.
+    """
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.samples = np.zeros((capacity, width))
+        self.timestamps = np.zeros(capacity)
+        self.count = 0  # number of samples appended so far
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def width(self):
+        return self.samples.shape[1]
+
+    def grow(self, width):
+        """Widens the buffer to `width` values per sample, reading the new columns of past samples as zero."""
+        if width > self.width:
+            samples = np.zeros((self.capacity, width))
+            samples[:, :self.width] = self.samples
+            self.samples = samples
+
+    def append(self, values, timestamp):
+        if len(values) > self.width:
+            raise ValueError(f'sample of {len(values)} values does not fit a ring buffer of width {self.width}')
+        row = self.count % self.capacity
+        n = len(values)
+        self.samples[row, :n] = values
+        self.samples[row, n:] = 0.0
+        self.timestamps[row] = timestamp
+        self.count += 1
+
+    def window(self, n):
+        """Returns copies of the timestamps and samples of the last `n` samples, oldest first."""
+        n = min(n, len(self))
+        rows = np.arange(self.count - n, self.count) % self.capacity
+        return self.timestamps[rows], self.samples[rows]
+
+
+class TelemetryCollector:
+    """Keeps the latest interface utilizations in a ring buffer, so reading the state of the network needs no I/O.
+
+    Samples are either polled from sFlow-RT by a background thread every `interval` seconds (see `start`), or
+    pushed by another source such as `SflowDatagramListener`. The ring buffer starts `interfaces` wide and grows
+    with the state store, so networks of any size keep all of their interfaces.
+    """
+
+    def __init__(self, client, link_bw, interval=1.0, capacity=600, interfaces=256):
+        self.client = client
+        self.link_bw = link_bw
+        self.interval = interval
+        self.store = StateStore()
+        self.buffer = RingBuffer(capacity, interfaces)
+        self._sample_added = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts polling sFlow-RT in a background thread."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='telemetry-collector', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            started = monotonic()
+            try:
+                metrics = self.client.fetch(('ifoutoctets', 'of_dpid', 'of_port'))
+            except requests.RequestException as e:
+                info(f'*** Failed to poll sflow-rt: {e}\n')
+            else:
+                utilizations = {data_source: (value * 8) / self.link_bw
+                                for data_source, value in metrics['ifoutoctets'].items()}
+                self.push(utilizations, metrics['of_dpid'], metrics['of_port'])
+            self._stopped.wait(max(0.0, self.interval - (monotonic() - started)))
+
+    def push(self, utilizations, dpids, ports, timestamp=None):
+        """Adds a complete sample of `{dataSource: value}` utilizations, OpenFlow device IDs and port numbers."""
+        with self._sample_added:
+            self.store.update(utilizations, dpids, ports)
+            if len(self.store) > self.buffer.width:
+                self.buffer.grow(max(len(self.store), 2 * self.buffer.width))  # amortize copies as interfaces appear
+            self.buffer.append(self.store.utilization, time() if timestamp is None else timestamp)
+            self._sample_added.notify_all()
+
+    def snapshot(self):
+        """Returns a copy of the state store as of the latest sample."""
+        with self._sample_added:
+            return self.store.copy()
+
+    def window(self, n):
+        """Returns the timestamps and a `(samples, interfaces)` array of the last `n` utilization samples."""
+        with self._sample_added:
+            timestamps, samples = self.buffer.window(n)
+            return timestamps, samples[:, :len(self.store)]
+
+    def wait_for_samples(self, n=1, timeout=None):
+        """Blocks until `n` new samples have been added. Returns False if `timeout` seconds passed first."""
+        with self._sample_added:
+            target = self.buffer.count + n
+            return self._sample_added.wait_for(lambda: self.buffer.count >= target, timeout)
+
+    def wait_until(self, predicate, timeout=None, fresh=False):
+        """Blocks until `predicate(store)` holds for the latest sample. Returns False if `timeout` passed first.
+
+        With `fresh` set, only samples added after the call count, so a sample taken before it can not satisfy it.
+        """
+        with self._sample_added:
+            after = self.buffer.count if fresh else -1
+            return self._sample_added.wait_for(lambda: self.buffer.count > after and predicate(self.store), timeout)
+
+
+class SflowDatagramListener:
+    """Listens for sFlow v5 datagrams and turns generic interface counter samples into collector samples.
+
+    sFlow agents only export raw octet counters, so utilizations are computed from the difference between two
+    consecutive samples of an interface. OpenFlow device IDs and port numbers are not part of the datagrams and
+    must be given as `{dataSource: value}` dicts, e.g. from a single sFlow-RT dump.
+    """
+
+    def __init__(self, collector, dpids, ports, host='0.0.0.0', port=6343):
+        self.collector = collector
+        self.dpids = dpids
+        self.ports = ports
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.settimeout(0.5)
+        self._counters = {}  # dataSource -> (uptime in ms, ifOutOctets) of the last counter sample
+        self._pending = {}  # dataSource -> utilization not yet pushed to the collector
+        self._last_push = monotonic()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sflow-listener', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.socket.close()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                datagram = self.socket.recv(65535)
+            except socket.timeout:
+                continue
+            self.handle(datagram)
+
+    def handle(self, datagram):
+        """Parses a datagram and pushes a sample once every known interface has reported, or `interval` passed."""
+        for data_source, uptime, out_octets in _parse_counter_samples(datagram):
+            previous = self._counters.get(data_source)
+            self._counters[data_source] = (uptime, out_octets)
+            if previous is not None and uptime > previous[0]:
+                rate = (out_octets - previous[1]) / ((uptime - previous[0]) / 1000)
+                self._pending[data_source] = max(rate, 0) * 8 / self.collector.link_bw
+        complete = self._pending.keys() >= self.dpids.keys()
+        if self._pending and (complete or monotonic() - self._last_push >= self.collector.interval):
+            self.collector.push(self._pending, self.dpids, self.ports)
+            self._pending = {}
+            self._last_push = monotonic()
+
+
+def _parse_counter_samples(datagram):
+    """Yields `(dataSource, uptime, ifOutOctets)` for each generic interface counter record of an sFlow v5 datagram."""
+    version, address_type = struct.unpack_from('>II', datagram, 0)
+    if version != 5:
+        return
+    offset = 8 + (4 if address_type == 1 else 16)
+    _, _, uptime, n_samples = struct.unpack_from('>IIII', datagram, offset)
+    offset += 16
+    for _ in range(n_samples):
+        sample_type, sample_length = struct.unpack_from('>II', datagram, offset)
+        sample_end = offset + 8 + sample_length
+        if sample_type in (2, 4):  # counter sample, expanded counter sample
+            header_length = 12 if sample_type == 2 else 16
+            n_records, = struct.unpack_from('>I', datagram, offset + 8 + header_length - 4)
+            record = offset + 8 + header_length
+            for _ in range(n_records):
+                record_type, record_length = struct.unpack_from('>II', datagram, record)
+                if record_type == 1:  # generic interface counters
+                    if_index, = struct.unpack_from('>I', datagram, record + 8)
+                    out_octets, = struct.unpack_from('>Q', datagram, record + 8 + 56)
+                    yield str(if_index), uptime, out_octets
+                record += 8 + record_length
+        offset = sample_end
@@ -0,0 +1,36 @@
+import os
+import sys
+import pytest
+
+# The modules of the app are imported by name, like the scripts do when run from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def attach():
+    """Returns a function that attaches a `NetworkEnvironment` to stand-ins for sFlow-RT and ONOS.
+
+    The function takes the `interfaces` served by `FakeSflowRt`, the simulated network served by `FakeOnos`, by
+    default `TopoThree`, and keyword arguments of the environment. It returns `(env, sflow_rt, onos)`.
+    """
+    from fake_onos import FakeOnos
+    from fake_sflow_rt import FakeSflowRt
+    from network_environment import NetworkEnvironment
+    from simulated_environment import SimulatedNetworkEnvironment
+    attached = []
+
+    def attach(interfaces, network=None, **kwargs):
+        kwargs.setdefault('flow_sync_interval', None)
+        sflow_rt = FakeSflowRt(interfaces, latency=0.0).start()
+        onos = FakeOnos(network if network is not None else SimulatedNetworkEnvironment(), latency=0.0).start()
+        attached.append((None, sflow_rt, onos))
+        env = NetworkEnvironment(emulate=False, onos_url=onos.url, sflow_rt_url=sflow_rt.url, **kwargs)
+        attached[-1] = (env, sflow_rt, onos)
+        return env, sflow_rt, onos
+
+    yield attach
+    for env, sflow_rt, onos in attached:
+        onos.stop()  # first, to release the long-poll of a congestion event stream
+        sflow_rt.stop()
+        if env is not None:
+            env.cleanup()
@@ -0,0 +1,42 @@
+from time import monotonic, sleep
+from simulated_environment import SimulatedNetworkEnvironment
+
+
+def _ports_with_flows(network):
+    return [(device_id, port) for device_id, flows in sorted(network.fwd_flows.items())
+            for port in sorted(set(flows.values()))]
+
+
+def test_server_actions_match_the_flow_table_lookup(attach):
+    network = SimulatedNetworkEnvironment()
+    network.test_three()
+    network.get_states()
+    env, _, _ = attach({}, network)
+    ports = _ports_with_flows(network)
+    assert ('of:0000000000000004', '3') in ports
+    for device_id, port in ports:
+        env.server_actions = False
+        env.get_available_actions(device_id, port)
+        local = env.actions
+        env.server_actions = True
+        env.get_available_actions(device_id, port)
+        assert env.actions == local, (device_id, port)
+
+
+def test_congestion_events_fill_the_flow_table(attach):
+    network = SimulatedNetworkEnvironment()
+    env, _, onos = attach({}, network, congestion_events=True)
+    s1 = 'of:0000000000000001'
+    flow = {'id': '7', 'ethSrc': network.host_macs['h1'], 'ethDst': network.host_macs['h4'], 'inPort': '1',
+            'outPort': '3'}
+    onos.publish({'type': 'CONGESTED', 'device': s1, 'port': '3', 'utilization': 0.9, 'flows': [flow]})
+    assert env.wait_for_congestion(timeout=2) == [(s1, '3')]
+
+    env.get_available_actions(s1, '3')  # fakeonos has no such flow, so the actions come from the event
+    assert env.actions and {action['in_port'] for action in env.actions} == {'1'}
+
+    onos.publish({'type': 'CLEARED', 'device': s1, 'port': '3', 'utilization': 0.1, 'flows': []})
+    deadline = monotonic() + 2
+    while env.congestion_events.congested and monotonic() < deadline:
+        sleep(0.01)
+    assert env.congestion_events.flows(s1, '3') is None
@@ -0,0 +1,21 @@
+import pytest
+from control_loop import step
+from fake_sflow_rt import interfaces_from_states
+from network_environment import mininet_link_bw
+from simulated_environment import SimulatedNetworkEnvironment
+
+
+def test_step_observes_a_sample_streamed_after_the_action(attach):
+    network = SimulatedNetworkEnvironment()
+    env, sflow_rt, _ = attach(interfaces_from_states(network.states, mininet_link_bw), network,
+                              telemetry_interval=0.05)
+    assert env.reset(settle_timeout=2)
+
+    network.test_three()  # the load the action leads to, only visible to samples taken after it
+    network.get_states()
+    sflow_rt.interfaces = interfaces_from_states(network.states, mininet_link_bw)
+    samples = env.collector.buffer.count
+    _, _, target, reward = step(env, None, 0)
+    assert env.collector.buffer.count > samples
+    assert reward == pytest.approx(-network.states.total_utilization())
+    assert target is not None
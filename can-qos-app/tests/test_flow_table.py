@@ -0,0 +1,74 @@
+from time import sleep
+from fake_onos import _flow_json
+from flow_table import FlowTableMirror
+
+DEVICE = 'of:0000000000000001'
+H1, H4 = '00:00:00:00:00:01', '00:00:00:00:00:04'
+
+
+class FlowDump:
+    """Returns a list of flows as ONOS `/flows` would, counting how often it is fetched."""
+
+    def __init__(self, flows):
+        self.flows = flows
+        self.fetches = 0
+
+    def __call__(self):
+        self.fetches += 1
+        return self.flows
+
+
+def test_sync_picks_up_a_changed_treatment_under_the_same_id():
+    flow = _flow_json(DEVICE, H1, H4, '1', '2')
+    mirror = FlowTableMirror(FlowDump([flow]))
+    assert mirror.sync() == (1, 0)
+    assert mirror.flows_on_port(DEVICE, '2') == [(H1, H4, '1', '2')]
+
+    moved = _flow_json(DEVICE, H1, H4, '1', '3')
+    assert moved['id'] == flow['id']
+    assert mirror.sync([moved]) == (1, 1)
+    assert mirror.flows_on_port(DEVICE, '2') == []
+    assert mirror.flows_on_port(DEVICE, '3') == [(H1, H4, '1', '3')]
+    assert mirror.sync([moved]) == (0, 0)
+
+
+def test_sync_drops_flows_pending_removal():
+    flow = _flow_json(DEVICE, H1, H4, '1', '2')
+    mirror = FlowTableMirror(FlowDump([flow]))
+    mirror.sync()
+    assert mirror.sync([dict(flow, state='PENDING_REMOVE')]) == (0, 1)
+    assert len(mirror) == 0
+
+
+def test_lookups_only_sync_a_mirror_that_was_never_synced():
+    dump = FlowDump([_flow_json(DEVICE, H1, H4, '1', '2')])
+    mirror = FlowTableMirror(dump)
+    for _ in range(3):
+        mirror.flows_on_port(DEVICE, '2')
+        mirror.flows_between(H1, H4)
+    assert dump.fetches == 1
+
+
+def test_lookup_of_a_port_filled_by_an_event_skips_the_dump():
+    dump = FlowDump([])
+    mirror = FlowTableMirror(dump, max_age=60)
+    mirror.replace_port(DEVICE, '2', [{'id': '7', 'ethSrc': H1, 'ethDst': H4, 'inPort': '1', 'outPort': '2'}])
+    assert mirror.flows_on_port(DEVICE, '2') == [(H1, H4, '1', '2')]
+    assert dump.fetches == 0
+    mirror.flows_on_port(DEVICE, '3')
+    assert dump.fetches == 1
+
+
+def test_lookup_before_the_first_background_sync_finished_sees_the_flows():
+    dump = FlowDump([_flow_json(DEVICE, H1, H4, '1', '2')])
+
+    def slow_dump():
+        if dump.fetches == 0:
+            sleep(0.2)  # the first sync of the thread is still running when the lookup comes
+        return dump()
+
+    mirror = FlowTableMirror(slow_dump, sync_interval=60).start()
+    try:
+        assert mirror.flows_on_port(DEVICE, '2') == [(H1, H4, '1', '2')]
+    finally:
+        mirror.stop()
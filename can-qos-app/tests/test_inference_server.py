@@ -0,0 +1,39 @@
+from time import perf_counter
+import numpy as np
+import pytest
+import torch
+from inference_server import InferenceServer
+
+
+class FailingModel(torch.nn.Module):
+    def forward(self, observations):
+        raise RuntimeError('forward pass failed')
+
+
+def _request(n_actions=4):
+    return np.zeros(8, dtype=np.float32), np.ones(n_actions, dtype=bool)
+
+
+def test_failed_forward_pass_resolves_every_future_of_the_batch():
+    server = InferenceServer(FailingModel(), max_wait=0.05)
+    try:
+        futures = [server.submit(*_request()) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match='forward pass failed'):
+                future.result(timeout=5)
+        assert server._thread.is_alive()
+    finally:
+        server.close()
+
+
+def test_flush_answers_without_waiting_for_max_wait():
+    server = InferenceServer(torch.nn.Linear(8, 4), max_wait=30)
+    try:
+        started = perf_counter()
+        futures = [server.submit(*_request()) for _ in range(2)]
+        server.flush()
+        assert all(0 <= future.result(timeout=5) < 4 for future in futures)
+        assert perf_counter() - started < 5
+        assert list(server.batch_sizes) == [2]
+    finally:
+        server.close()
@@ -0,0 +1,34 @@
+from time import monotonic, sleep
+import pytest
+from fake_sflow_rt import interfaces_from_states
+from network_environment import dpid_from_name, mininet_link_bw
+from simulated_environment import SimulatedNetworkEnvironment
+
+
+@pytest.mark.parametrize('telemetry_interval', [None, 0.05])
+def test_reset_does_not_settle_without_telemetry(attach, telemetry_interval):
+    env, _, _ = attach({}, telemetry_interval=telemetry_interval)
+    assert env.reset(settle_timeout=0.2) is False
+
+
+@pytest.mark.parametrize('telemetry_interval', [None, 0.05])
+def test_reset_settles_on_idle_interfaces(attach, telemetry_interval):
+    idle = interfaces_from_states(SimulatedNetworkEnvironment().states, mininet_link_bw)
+    env, _, _ = attach(idle, telemetry_interval=telemetry_interval)
+    assert env.reset(settle_timeout=2) is True
+
+
+@pytest.mark.parametrize('flow_sync_interval', [0.05, None])
+def test_lookups_with_congestion_events_see_flows_installed_later(attach, flow_sync_interval):
+    network = SimulatedNetworkEnvironment()
+    env, _, _ = attach({}, network, congestion_events=True, flow_sync_interval=flow_sync_interval)
+    s1 = f'of:{dpid_from_name("s1")}'
+    env.get_available_actions(s1, '3')
+    assert env.actions == []
+
+    network.test_three()  # installs fwd flows, without any congestion event reporting them
+    deadline = monotonic() + 3
+    while not env.actions and monotonic() < deadline:
+        sleep(0.05)
+        env.get_available_actions(s1, '3')
+    assert len(env.actions) == 2
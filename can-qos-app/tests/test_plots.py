@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('matplotlib')
+from plots import _blocks, _decimate, _reduce, generate_link_utilization_plot  # noqa: E402
+
+
+def test_decimation_keeps_extremes_in_the_order_they_occurred():
+    data = np.array([[0.5, 0.1], [0.9, 0.2], [0.1, 0.8], [0.4, 0.3],
+                     [0.2, 0.6], [0.3, 0.0], [0.7, 0.5], [0.6, 0.4]])
+    _, steps, minima, maxima = _reduce(_blocks([data], block_rows=3), threshold=0.25, bucket=4, n_interfaces=2)
+    time_steps, values = _decimate(minima, maxima)
+    assert steps == 8
+    # interface 0 peaks before its minimum in the first bucket, interface 1 the other way round
+    np.testing.assert_array_equal(time_steps[:, 0], [1, 2, 4, 6])
+    np.testing.assert_array_equal(values[:, 0], [0.9, 0.1, 0.2, 0.7])
+    np.testing.assert_array_equal(time_steps[:, 1], [0, 2, 4, 5])
+    np.testing.assert_array_equal(values[:, 1], [0.1, 0.8, 0.6, 0.0])
+
+
+def test_empty_series_is_plotted_without_errors(tmp_path):
+    _, steps, minima, maxima = _reduce(_blocks([np.zeros((0, 3))], 16), 0.25, 1, 3)
+    time_steps, values = _decimate(minima, maxima)
+    assert steps == 0 and time_steps.shape == values.shape == (0, 3)
+    output_path = tmp_path / 'empty.png'
+    assert generate_link_utilization_plot(np.zeros((0, 3)), output_path=str(output_path)) == str(output_path)
+    assert output_path.exists()
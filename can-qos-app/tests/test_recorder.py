@@ -0,0 +1,25 @@
+import numpy as np
+from recorder import EpisodeRecorder, RecordedRun
+
+
+def test_manifest_maps_columns_to_interfaces_as_they_appear(tmp_path):
+    recorder = EpisodeRecorder(str(tmp_path), state_dim=3, observation_dim=6, n_actions=4,
+                               interfaces=[('0000000000000001', '2')])
+    observations, masks = np.zeros((1, 6), dtype=np.float32), np.zeros((1, 4), dtype=bool)
+    recorder.record(0, observations, masks, [0], [0.0], interfaces=[('0000000000000001', '2')])
+    recorder.record(0, observations, masks, [0], [0.0],
+                    interfaces=[('0000000000000001', '2'), ('000000000000000a', '1')])
+    recorder.close()
+
+    run = RecordedRun(str(tmp_path))
+    assert run.interfaces == [('0000000000000001', '2'), ('000000000000000a', '1')]
+    assert run.interface_names == ['s1-eth2', 's10-eth1']
+    assert len(run) == 2
+
+
+def test_given_interface_names_are_kept(tmp_path):
+    recorder = EpisodeRecorder(str(tmp_path), state_dim=2, observation_dim=4, interface_names=['uplink'],
+                               interfaces=[('0000000000000001', '1'), ('0000000000000001', '2')])
+    recorder.record(0, np.zeros((1, 4), dtype=np.float32), np.zeros((1, 4), dtype=bool), [0], [0.0])
+    recorder.close()
+    assert RecordedRun(str(tmp_path)).interface_names == ['uplink', 's1-eth2']
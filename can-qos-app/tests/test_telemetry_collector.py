@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from telemetry_collector import RingBuffer, TelemetryCollector
+
+
+def _sample(n_interfaces, value):
+    data_sources = [str(i) for i in range(n_interfaces)]
+    return ({s: value for s in data_sources}, {s: f'{int(s) // 4 + 1:016x}' for s in data_sources},
+            {s: str(int(s) % 4 + 1) for s in data_sources})
+
+
+def test_ring_buffer_rejects_samples_wider_than_the_buffer():
+    buffer = RingBuffer(4, 2)
+    with pytest.raises(ValueError):
+        buffer.append(np.ones(3), 0.0)
+    assert len(buffer) == 0
+
+
+def test_ring_buffer_grows_and_keeps_past_samples():
+    buffer = RingBuffer(4, 2)
+    buffer.append(np.array([0.1, 0.2]), 1.0)
+    buffer.grow(3)
+    buffer.append(np.array([0.3, 0.4, 0.5]), 2.0)
+    timestamps, samples = buffer.window(2)
+    np.testing.assert_array_equal(timestamps, [1.0, 2.0])
+    np.testing.assert_array_equal(samples, [[0.1, 0.2, 0.0], [0.3, 0.4, 0.5]])
+
+
+def test_collector_keeps_more_than_256_interfaces():
+    collector = TelemetryCollector(client=None, link_bw=10_000_000)
+    collector.push(*_sample(10, 0.1), timestamp=1.0)
+    collector.push(*_sample(300, 0.5), timestamp=2.0)
+    timestamps, samples = collector.window(2)
+    assert samples.shape == (2, 300)
+    assert np.all(samples[1] == 0.5)
+    assert np.all(samples[0, 10:] == 0.0)
@@ -0,0 +1,30 @@
+from functools import partial
+import numpy as np
+import pytest
+from vector_env import ProcessVectorEnvironment, VectorEnvironment
+from simulated_environment import SimulatedNetworkEnvironment
+
+
+def _not_simulated():
+    return object()
+
+
+def test_process_vector_environment_steps_like_the_in_process_one():
+    env_fns = [partial(SimulatedNetworkEnvironment, seed=i) for i in range(2)]
+    envs, workers = VectorEnvironment(env_fns), ProcessVectorEnvironment(env_fns)
+    try:
+        assert workers.state_dim == envs.state_dim
+        for vector in (envs, workers):
+            vector.call('test_three', 100)
+        for expected, result in zip(envs.observe(), workers.observe()):
+            np.testing.assert_array_equal(expected, result)
+        for expected, result in zip(envs.step(np.array([1, 0])), workers.step(np.array([1, 0]))):
+            np.testing.assert_array_equal(expected, result)
+    finally:
+        envs.close()
+        workers.close()
+
+
+def test_process_vector_environment_refuses_other_environments():
+    with pytest.raises(ValueError):
+        ProcessVectorEnvironment([partial(SimulatedNetworkEnvironment), _not_simulated])
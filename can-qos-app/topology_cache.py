@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+from collections import OrderedDict
+from time import monotonic
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries expire `ttl` seconds after they were loaded."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expiry time, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, load):
+        """Returns the cached value of `key`, calling `load(key)` on a miss or after the entry has expired."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = load(key)
+        self._entries[key] = (monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)  # evict the least recently used entry
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+
+class TopologyCache:
+    """Caches ONOS host locations, and drops them whenever the ONOS topology changes.
+
+    The topology version is polled at most once every `poll_interval` seconds, so warm lookups make no REST calls.
+    Call `invalidate()` directly when topology changes are learned from events instead.
+    """
+
+    def __init__(self, get_host_locations, get_topology_version, maxsize=4096, ttl=300, poll_interval=1.0):
+        self._get_host_locations = get_host_locations
+        self._get_topology_version = get_topology_version
+        self.poll_interval = poll_interval
+        self.hosts = TTLCache(maxsize, ttl)
+        self.on_change = []  # callbacks invoked after the cache has been invalidated
+        self.invalidations = 0
+        self._version = None
+        self._last_poll = None
+
+    def _check_topology(self):
+        now = monotonic()
+        if self._last_poll is not None and now - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = now
+        version = self._get_topology_version()
+        if self._version is not None and version != self._version:
+            self.invalidate()
+        self._version = version
+
+    def invalidate(self):
+        """Drops all cached host locations."""
+        self.hosts.clear()
+        self.invalidations += 1
+        for callback in self.on_change:
+            callback()
+
+    def host_locations(self, host_id):
+        """Returns the switches a host is connected to."""
+        self._check_topology()
+        return self.hosts.get(host_id, self._get_host_locations)
+
+    def stats(self):
+        return {'host_hits': self.hosts.hits, 'host_misses': self.hosts.misses, 'size': len(self.hosts),
+                'invalidations': self.invalidations}
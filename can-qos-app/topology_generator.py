@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+import math
+import random
+from mininet.topo import Topo
+from mininet.node import Host, OVSKernelSwitch
+from mininet.link import TCLink
+
+
+def _host_params(i):
+    """Returns the IP and MAC address of the `i`-th host, counting from 1, unique for up to 65535 hosts."""
+    return {'ip': f'10.0.{i >> 8}.{i & 0xff}', 'mac': f'00:00:00:00:{i >> 8:02x}:{i & 0xff:02x}'}
+
+
+class GeneratedTopo(Topo):
+    """Base class of the generated topologies, which number switches `s1`, `s2`, ... and hosts `h1`, `h2`, ...
+
+    Switch names must have unique numbers since Mininet derives datapath IDs from them.
+    """
+
+    def add_switch(self):
+        return self.addSwitch(f's{len(self.switches()) + 1}', cls=OVSKernelSwitch, protocols='OpenFlow13')
+
+    def add_hosts(self, switch, n_hosts, bw):
+        for _ in range(n_hosts):
+            i = len(self.hosts()) + 1
+            host = self.addHost(f'h{i}', cls=Host, **_host_params(i))
+            self.addLink(host, switch, cls=TCLink, bw=bw)
+
+
+class FatTree(GeneratedTopo):
+    """k-ary fat-tree with `(k/2)^2` core switches and `k` pods of `k/2` aggregation and `k/2` edge switches.
+
+    Every edge switch connects `k/2` hosts, so the topology has `k^3/4` hosts and `5k^2/4` switches.
+    """
+
+    def build(self, k=4, bw=10):
+        k = int(k)
+        half = k // 2
+        cores = [self.add_switch() for _ in range(half * half)]
+        for _ in range(k):
+            aggregations = [self.add_switch() for _ in range(half)]
+            edges = [self.add_switch() for _ in range(half)]
+            for i, aggregation in enumerate(aggregations):
+                for core in cores[i * half:(i + 1) * half]:
+                    self.addLink(aggregation, core, cls=TCLink, bw=bw)
+                for edge in edges:
+                    self.addLink(aggregation, edge, cls=TCLink, bw=bw)
+            for edge in edges:
+                self.add_hosts(edge, half, bw)
+
+
+class LeafSpine(GeneratedTopo):
+    """Two-tier Clos topology in which every leaf switch connects to every spine switch and to its own hosts."""
+
+    def build(self, spines=2, leaves=4, hosts_per_leaf=2, bw=10):
+        spine_switches = [self.add_switch() for _ in range(int(spines))]
+        for _ in range(int(leaves)):
+            leaf = self.add_switch()
+            for spine in spine_switches:
+                self.addLink(leaf, spine, cls=TCLink, bw=bw)
+            self.add_hosts(leaf, int(hosts_per_leaf), bw)
+
+
+class Ring(GeneratedTopo):
+    """Ring of switches, each connecting its own hosts."""
+
+    def build(self, switches=4, hosts_per_switch=1, bw=10):
+        ring = [self.add_switch() for _ in range(int(switches))]
+        for i, switch in enumerate(ring):
+            if len(ring) > 2 or i == 1:
+                self.addLink(switch, ring[i - 1], cls=TCLink, bw=bw)
+            self.add_hosts(switch, int(hosts_per_switch), bw)
+
+
+class Waxman(GeneratedTopo):
+    """Random Waxman topology of switches placed uniformly in the unit square.
+
+    Switches `u` and `v` at distance `d` are linked with probability `beta * exp(-d / (alpha * L))`, where `L` is
+    the largest possible distance. A random spanning tree is added first, so the topology is always connected.
+    """
+
+    def build(self, switches=10, hosts_per_switch=1, alpha=0.4, beta=0.4, seed=0, bw=10):
+        rng = random.Random(int(seed))
+        nodes = [self.add_switch() for _ in range(int(switches))]
+        positions = [(rng.random(), rng.random()) for _ in nodes]
+        linked = set()
+        for i in range(1, len(nodes)):
+            linked.add((rng.randrange(i), i))
+        for u in range(len(nodes)):
+            for v in range(u + 1, len(nodes)):
+                distance = math.dist(positions[u], positions[v])
+                if rng.random() < float(beta) * math.exp(-distance / (float(alpha) * math.sqrt(2))):
+                    linked.add((u, v))
+        for u, v in sorted(linked):
+            self.addLink(nodes[u], nodes[v], cls=TCLink, bw=bw)
+        for switch in nodes:
+            self.add_hosts(switch, int(hosts_per_switch), bw)
+
+
+# Traffic matrices as lists of `(client, server, rate in Mbit/s)`, like those of the test scenarios
+def uniform_traffic(hosts, n_flows, rate=5, seed=0):
+    """Returns `n_flows` flows between uniformly random pairs of distinct hosts."""
+    rng = random.Random(seed)
+    return [(client, server, rate) for client, server in (rng.sample(hosts, 2) for _ in range(n_flows))]
+
+
+def permutation_traffic(hosts, rate=5, seed=0):
+    """Returns one flow from every host to another host, such that every host receives exactly one flow."""
+    rng = random.Random(seed)
+    servers = list(hosts)
+    while len(hosts) > 1 and any(client == server for client, server in zip(hosts, servers)):
+        rng.shuffle(servers)
+    return [(client, server, rate) for client, server in zip(hosts, servers) if client != server]
+
+
+def hotspot_traffic(hosts, n_clients, rate=5, seed=0):
+    """Returns flows from `n_clients` random hosts to one random server, i.e. an incast."""
+    rng = random.Random(seed)
+    server = rng.choice(hosts)
+    clients = rng.sample([host for host in hosts if host != server], min(n_clients, len(hosts) - 1))
+    return [(client, server, rate) for client in clients]
+
+
+generated_topos = {'fattree': FatTree,
+                   'leafspine': LeafSpine,
+                   'ring': Ring,
+                   'waxman': Waxman}
+
+traffic_generators = {'uniform': uniform_traffic,
+                      'permutation': permutation_traffic,
+                      'hotspot': hotspot_traffic}
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+import random
+import threading
+from collections import namedtuple
+from time import monotonic
+from mininet.log import info
+from mininet.util import waitListening
+
+iperf_port = 5001
+
+# A flow of a traffic schedule: `rate` in Mbit/s from `client` to the iperf server on `server`, starting `start`
+# seconds into the scenario and lasting `duration` seconds. With `on` and `off` set, the flow alternates between
+# sending for `on` seconds and pausing for `off` seconds.
+FlowSpec = namedtuple('FlowSpec', ('client', 'server', 'rate', 'start', 'duration', 'on', 'off', 'udp'),
+                      defaults=(0.0, 30.0, None, None, False))
+
+# One continuous burst of a flow, i.e. one iperf client run, from `start` to `end` seconds into the scenario
+Segment = namedtuple('Segment', ('start', 'end', 'client', 'server', 'rate', 'udp'))
+
+# Traffic generated by the test scenarios of `NetworkEnvironment`, as `(client, server, rate in Mbit/s)`
+traffic_matrices = {'test_one': [('h2', 'h1', 10)],
+                    'test_two': [('h1', 'h2', 10)],
+                    'test_three': [('h1', 'h4', 5), ('h3', 'h2', 5)],
+                    'test_four': [('h1', 'h4', 10), ('h3', 'h2', 10), ('h5', 'h4', 10), ('h6', 'h4', 10)]}
+
+
+def from_traffic_matrix(traffic_matrix, duration=30, start=0.0, on=None, off=None):
+    """Returns one flow per `(client, server, rate in Mbit/s)` of a traffic matrix, all with the same timing."""
+    return [FlowSpec(client, server, rate, start, duration, on, off) for client, server, rate in traffic_matrix]
+
+
+def poisson_flows(hosts, arrival_rate, mean_duration, horizon, rate=5, seed=0):
+    """Returns flows between random pairs of distinct hosts that arrive as a Poisson process.
+
+    Flows arrive at `arrival_rate` flows per second until `horizon` seconds and last exponentially distributed
+    durations with mean `mean_duration` seconds.
+    """
+    rng = random.Random(seed)
+    flows = []
+    start = rng.expovariate(arrival_rate)
+    while start < horizon:
+        client, server = rng.sample(hosts, 2)
+        flows.append(FlowSpec(client, server, rate, start, rng.expovariate(1 / mean_duration)))
+        start += rng.expovariate(arrival_rate)
+    return flows
+
+
+def segments(flows):
+    """Expands the on/off periods of flows into segments sorted by start time."""
+    expanded = []
+    for flow in flows:
+        end = flow.start + flow.duration
+        if flow.on is None or flow.off is None:
+            expanded.append(Segment(flow.start, end, flow.client, flow.server, flow.rate, flow.udp))
+            continue
+        start = flow.start
+        while start < end:
+            expanded.append(Segment(start, min(start + flow.on, end), flow.client, flow.server, flow.rate, flow.udp))
+            start += flow.on + flow.off
+    return sorted(expanded)
+
+
+def expected_load(scenario_segments, at):
+    """Returns `{server: rate in Mbit/s}` of the segments active `at` seconds into the scenario."""
+    load = {}
+    for segment in scenario_segments:
+        if segment.start <= at < segment.end:
+            load[segment.server] = load.get(segment.server, 0) + segment.rate
+    return load
+
+
+class ScenarioEngine:
+    """Plays a traffic schedule on the hosts of a Mininet network from a background thread.
+
+    `start` launches an iperf server on every receiving host and waits until they listen, then returns while the
+    thread launches one background iperf client per segment when its start time comes. Clients run for the length
+    of their segment and stop on their own; `stop` kills the ones still running.
+    """
+
+    def __init__(self, net, flows):
+        self.net = net
+        self.segments = segments(flows)
+        self.started = None  # monotonic time the schedule started at
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def elapsed(self):
+        return monotonic() - self.started
+
+    def expected_load(self, at=None):
+        """Returns `{server: rate in Mbit/s}` of the flows active `at`, by default now, seconds into the scenario."""
+        return expected_load(self.segments, self.elapsed() if at is None else at)
+
+    def start(self, timeout=5):
+        servers = {(segment.server, segment.udp): segment.client for segment in self.segments}
+        info(f'*** Starting {len(servers)} iperf servers\n')
+        for server, udp in sorted(servers):
+            self.net.get(server).cmd(f'iperf -s {"-u " if udp else ""}-p {iperf_port} &')
+        for (server, udp), client in sorted(servers.items()):
+            if not udp:  # udp servers can not be probed, but are up as soon as their socket is bound
+                waitListening(client=self.net.get(client), server=self.net.get(server), port=iperf_port,
+                              timeout=timeout)
+        self._stopped.clear()
+        self.started = monotonic()
+        self._thread = threading.Thread(target=self._run, name='traffic-scenario', daemon=True)
+        self._thread.start()
+        info(f'*** Traffic scenario of {len(self.segments)} flows running as background task\n')
+        return self
+
+    def stop(self):
+        """Stops launching flows and kills all iperf clients and servers."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.net.hosts:
+            self.net.hosts[0].cmd('killall -9 iperf')  # hosts share the process namespace
+
+    def _run(self):
+        for segment in self.segments:
+            if self._stopped.wait(max(segment.start - self.elapsed(), 0)):
+                return
+            client, server = self.net.get(segment.client, segment.server)
+            client.cmd(f'iperf -c {server.IP()} -p {iperf_port} {"-u " if segment.udp else ""}-b {segment.rate}m '
+                       f'-t {segment.end - segment.start:g} &')
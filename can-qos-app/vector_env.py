@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+import multiprocessing
+import numpy as np
+from control_loop import observe, step
+from simulated_environment import SimulatedNetworkEnvironment
+
+
+class VectorEnvironment:
+    """Steps N environments in lockstep and returns their observations and rewards as stacked arrays.
+
+    `env_fns` are zero-argument callables that each create one environment, e.g.
+    `functools.partial(SimulatedNetworkEnvironment, seed=i)`. All environments must have the same `state_dim`.
+    """
+
+    def __init__(self, env_fns, threshold=0.4, max_actions=4):
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.state_dim = self.envs[0].state_dim
+        self.threshold = threshold
+        self.max_actions = max_actions
+        self._targets = [None] * len(self.envs)
+
+    def __len__(self):
+        return len(self.envs)
+
+    def _stack(self, results):
+        observations, masks, self._targets = (list(column) for column in zip(*results))
+        return np.stack(observations), np.stack(masks)
+
+    def observe(self):
+        """Returns the `(N, observation_dim)` observations and `(N, max_actions)` action masks."""
+        return self._stack([observe(env, self.threshold, self.max_actions) for env in self.envs])
+
+    def step(self, action_indices):
+        """Performs one action per environment and returns the next observations, masks and `(N,)` rewards."""
+        results = [step(env, target, int(action_index), self.threshold, self.max_actions)
+                   for env, target, action_index in zip(self.envs, self._targets, action_indices)]
+        observations, masks = self._stack([result[:3] for result in results])
+        return observations, masks, np.array([result[3] for result in results], dtype=np.float32)
+
+    def interfaces(self):
+        """Returns the `(of_dpid, of_port)` of every row of the state vector, as seen by the first environment."""
+        states = self.envs[0].states
+        return [states.interface(row) for row in range(len(states))]
+
+    def call(self, method, *args):
+        """Calls a method, such as `test_three`, on every environment and returns the results."""
+        return [getattr(env, method)(*args) for env in self.envs]
+
+    def close(self):
+        self.call('cleanup')
+
+
+def _worker(connection, env_fn, threshold, max_actions):
+    """Owns one environment in a worker process and executes the commands sent by `ProcessVectorEnvironment`."""
+    env = env_fn()
+    simulated = isinstance(env, SimulatedNetworkEnvironment)
+    interfaces = [env.states.interface(row) for row in range(len(env.states))] if simulated else None
+    connection.send((simulated, type(env).__name__, env.state_dim if simulated else None, interfaces))
+    if not simulated:  # refused, see `ProcessVectorEnvironment`
+        if hasattr(env, 'cleanup'):
+            env.cleanup()
+        return
+    target = None
+    while True:
+        command, args = connection.recv()
+        if command == 'observe':
+            observation, mask, target = observe(env, threshold, max_actions)
+            connection.send((observation, mask))
+        elif command == 'step':
+            observation, mask, target, reward = step(env, target, args[0], threshold, max_actions)
+            connection.send((observation, mask, reward))
+        elif command == 'call':
+            connection.send(getattr(env, args[0])(*args[1:]))
+        elif command == 'close':
+            env.cleanup()
+            connection.send(None)
+            break
+
+
+class ProcessVectorEnvironment:
+    """Steps N simulated networks in worker processes, so their steps run on separate cores.
+
+    Every worker creates and owns its environment, which must be a `SimulatedNetworkEnvironment`. Emulated networks
+    can not share a host: their topologies name switches and hosts alike, all of them read the same sFlow-RT
+    `TOPOLOGY` dump, and killing iperf or removing the flows of app 99 would hit every network. Step one emulated
+    network per host with `VectorEnvironment` instead.
+    """
+
+    def __init__(self, env_fns, threshold=0.4, max_actions=4, start_method='spawn'):
+        context = multiprocessing.get_context(start_method)
+        self.connections = []
+        self.processes = []
+        for env_fn in env_fns:
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_worker, args=(worker_connection, env_fn, threshold, max_actions),
+                                      daemon=True)
+            process.start()
+            worker_connection.close()  # the worker's copy is the only one left, so `recv` fails if it dies
+            self.connections.append(connection)
+            self.processes.append(process)
+        workers = [connection.recv() for connection in self.connections]
+        refused = sorted({name for simulated, name, _, _ in workers if not simulated})
+        if refused:
+            for connection, (simulated, _, _, _) in zip(self.connections, workers):
+                if simulated:
+                    connection.send(('close', ()))
+                    connection.recv()
+            for process in self.processes:
+                process.join()
+            raise ValueError(f'ProcessVectorEnvironment only steps simulated networks, not {", ".join(refused)}')
+        self.state_dim = workers[0][2]
+        self._interfaces = workers[0][3]  # simulated networks keep their interfaces for good
+
+    def __len__(self):
+        return len(self.connections)
+
+    def _broadcast(self, command, args_per_worker):
+        for connection, args in zip(self.connections, args_per_worker):
+            connection.send((command, args))
+        return [connection.recv() for connection in self.connections]
+
+    def observe(self):
+        results = self._broadcast('observe', [()] * len(self))
+        return np.stack([r[0] for r in results]), np.stack([r[1] for r in results])
+
+    def step(self, action_indices):
+        results = self._broadcast('step', [(int(action_index),) for action_index in action_indices])
+        return (np.stack([r[0] for r in results]), np.stack([r[1] for r in results]),
+                np.array([r[2] for r in results], dtype=np.float32))
+
+    def interfaces(self):
+        return self._interfaces
+
+    def call(self, method, *args):
+        return self._broadcast('call', [(method, *args)] * len(self))
+
+    def close(self):
+        self._broadcast('close', [()] * len(self))
+        for process in self.processes:
+            process.join()
@@ -0,0 +1,40 @@
+/*
+ * Copyright 2021-present Open Networking Foundation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+package org.student.canqos;
+
+import org.onosproject.net.ConnectPoint;
+import org.onosproject.net.PortNumber;
+import org.onosproject.net.flow.FlowRule;
+
+import java.util.Map;
+import java.util.SortedSet;
+
+/**
+ * Enumerates the reroutes available to the rerouting agent at a port.
+ */
+public interface ActionService {
+
+    /**
+     * Returns the fwd flows leaving a port together with the other ports of its device that lie on a shortest
+     * path to the location of their destination host.
+     *
+     * @param port egress port
+     * @return alternative egress ports in ascending order, keyed by flow rule in the order of the flows' in port,
+     *         source and destination MAC address
+     */
+    Map<FlowRule, SortedSet<PortNumber>> actions(ConnectPoint port);
+
+}
@@ -0,0 +1,363 @@
+/*
+ * Copyright 2021-present Open Networking Foundation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+package org.student.canqos;
+
+import com.google.common.base.Strings;
+import com.google.common.collect.ImmutableList;
+import com.google.common.collect.ImmutableMap;
+import com.google.common.collect.ImmutableSet;
+import org.onosproject.cfg.ComponentConfigService;
+import org.onosproject.core.ApplicationId;
+import org.onosproject.core.CoreService;
+import org.onosproject.net.ConnectPoint;
+import org.onosproject.net.Device;
+import org.onosproject.net.DeviceId;
+import org.onosproject.net.Host;
+import org.onosproject.net.HostLocation;
+import org.onosproject.net.Path;
+import org.onosproject.net.Port;
+import org.onosproject.net.PortNumber;
+import org.onosproject.net.device.DeviceEvent;
+import org.onosproject.net.device.DeviceListener;
+import org.onosproject.net.device.DeviceService;
+import org.onosproject.net.device.PortStatistics;
+import org.onosproject.net.flow.FlowEntry;
+import org.onosproject.net.flow.FlowId;
+import org.onosproject.net.flow.FlowRule;
+import org.onosproject.net.flow.FlowRuleEvent;
+import org.onosproject.net.flow.FlowRuleListener;
+import org.onosproject.net.flow.FlowRuleService;
+import org.onosproject.net.flow.criteria.Criterion;
+import org.onosproject.net.flow.criteria.EthCriterion;
+import org.onosproject.net.flow.criteria.PortCriterion;
+import org.onosproject.net.flow.instructions.Instruction;
+import org.onosproject.net.flow.instructions.Instructions.OutputInstruction;
+import org.onosproject.net.host.HostService;
+import org.onosproject.net.topology.PathService;
+import org.osgi.service.component.ComponentContext;
+import org.osgi.service.component.annotations.Activate;
+import org.osgi.service.component.annotations.Component;
+import org.osgi.service.component.annotations.Deactivate;
+import org.osgi.service.component.annotations.Modified;
+import org.osgi.service.component.annotations.Reference;
+import org.osgi.service.component.annotations.ReferenceCardinality;
+import org.slf4j.Logger;
+import org.slf4j.LoggerFactory;
+
+import java.util.ArrayDeque;
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.Comparator;
+import java.util.Deque;
+import java.util.Dictionary;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Properties;
+import java.util.Set;
+import java.util.SortedSet;
+import java.util.TreeSet;
+import java.util.concurrent.ConcurrentHashMap;
+
+import static org.onlab.util.Tools.get;
+
+/**
+ * Detects congested ports from port statistics, keeps the fwd flows leaving every port and enumerates their reroutes.
+ */
+@Component(immediate = true,
+           service = {CongestionService.class, ActionService.class},
+           property = {
+               "threshold:Double=0.4",
+               "linkSpeed:Long=10",
+               "eventBacklog:Integer=1000",
+           })
+public class AppComponent implements CongestionService, ActionService {
+
+    static final String FWD_APP = "org.onosproject.fwd";
+
+    /**
+     * Orders flows by in port, source and destination MAC address like the flow table mirror of the Python
+     * environment, so an action index picks the same reroute whichever side enumerated the actions.
+     */
+    private static final Comparator<FlowRule> FLOW_ORDER =
+            Comparator.comparing((FlowRule flow) -> criterion(flow, Criterion.Type.IN_PORT))
+                    .thenComparing(flow -> criterion(flow, Criterion.Type.ETH_SRC))
+                    .thenComparing(flow -> criterion(flow, Criterion.Type.ETH_DST));
+
+    private final Logger log = LoggerFactory.getLogger(getClass());
+
+    /** Utilization above which a port is congested. */
+    private double threshold = 0.4;
+
+    /**
+     * Capacity of every port in Mbit/s, or 0 to use the speed reported by the device. Defaults to the
+     * {@code bw} of the Mininet {@code TCLink}s, whose ports report 10 Gbit/s whatever their shaped rate.
+     */
+    private long linkSpeed = 10;
+
+    /** Number of most recent events kept for clients that poll. */
+    private int eventBacklog = 1000;
+
+    @Reference(cardinality = ReferenceCardinality.MANDATORY)
+    protected ComponentConfigService cfgService;
+
+    @Reference(cardinality = ReferenceCardinality.MANDATORY)
+    protected CoreService coreService;
+
+    @Reference(cardinality = ReferenceCardinality.MANDATORY)
+    protected DeviceService deviceService;
+
+    @Reference(cardinality = ReferenceCardinality.MANDATORY)
+    protected FlowRuleService flowRuleService;
+
+    @Reference(cardinality = ReferenceCardinality.MANDATORY)
+    protected HostService hostService;
+
+    @Reference(cardinality = ReferenceCardinality.MANDATORY)
+    protected PathService pathService;
+
+    final DeviceListener deviceListener = new InternalDeviceListener();
+    final FlowRuleListener flowRuleListener = new InternalFlowRuleListener();
+
+    private final Map<ConnectPoint, Double> utilizations = new ConcurrentHashMap<>();
+    private final Set<ConnectPoint> congested = ConcurrentHashMap.newKeySet();
+    private final Map<ConnectPoint, Map<FlowId, FlowRule>> fwdFlows = new ConcurrentHashMap<>();
+
+    private final Object eventLock = new Object();
+    private final Deque<CongestionEvent> events = new ArrayDeque<>();  // guarded by eventLock
+    private long lastEventId;  // guarded by eventLock
+    private boolean stopped;  // guarded by eventLock, releases waiting clients when set
+
+    @Activate
+    protected void activate(ComponentContext context) {
+        cfgService.registerProperties(getClass());
+        synchronized (eventLock) {
+            stopped = false;
+        }
+        modified(context);
+        flowRuleService.addListener(flowRuleListener);
+        deviceService.addListener(deviceListener);
+        for (Device device : deviceService.getAvailableDevices()) {
+            for (FlowEntry flow : flowRuleService.getFlowEntries(device.id())) {
+                addFwdFlow(flow);
+            }
+        }
+        log.info("Started");
+    }
+
+    @Deactivate
+    protected void deactivate() {
+        deviceService.removeListener(deviceListener);
+        flowRuleService.removeListener(flowRuleListener);
+        cfgService.unregisterProperties(getClass(), false);
+        synchronized (eventLock) {
+            stopped = true;
+            eventLock.notifyAll();  // release waiting clients
+        }
+        log.info("Stopped");
+    }
+
+    @Modified
+    public void modified(ComponentContext context) {
+        Dictionary<?, ?> properties = context != null ? context.getProperties() : new Properties();
+        if (context != null) {
+            String value = get(properties, "threshold");
+            threshold = Strings.isNullOrEmpty(value) ? threshold : Double.parseDouble(value.trim());
+            value = get(properties, "linkSpeed");
+            linkSpeed = Strings.isNullOrEmpty(value) ? linkSpeed : Long.parseLong(value.trim());
+            value = get(properties, "eventBacklog");
+            eventBacklog = Strings.isNullOrEmpty(value) ? eventBacklog : Integer.parseInt(value.trim());
+        }
+        log.info("Reconfigured");
+    }
+
+    @Override
+    public double threshold() {
+        return threshold;
+    }
+
+    @Override
+    public Map<ConnectPoint, Double> utilizations() {
+        return ImmutableMap.copyOf(utilizations);
+    }
+
+    @Override
+    public Set<FlowRule> fwdFlows(ConnectPoint port) {
+        return ImmutableSet.copyOf(fwdFlows.getOrDefault(port, Collections.emptyMap()).values());
+    }
+
+    @Override
+    public List<CongestionEvent> events(long after, long timeoutMillis) throws InterruptedException {
+        long deadline = System.currentTimeMillis() + timeoutMillis;
+        synchronized (eventLock) {
+            long remaining = timeoutMillis;
+            while (!stopped && lastEventId <= after && remaining > 0) {
+                eventLock.wait(remaining);
+                remaining = deadline - System.currentTimeMillis();
+            }
+            ImmutableList.Builder<CongestionEvent> newer = ImmutableList.builder();
+            for (CongestionEvent event : events) {
+                if (event.id() > after) {
+                    newer.add(event);
+                }
+            }
+            return newer.build();
+        }
+    }
+
+    @Override
+    public Map<FlowRule, SortedSet<PortNumber>> actions(ConnectPoint port) {
+        Map<FlowRule, SortedSet<PortNumber>> actions = new LinkedHashMap<>();
+        List<FlowRule> flows = new ArrayList<>(fwdFlows(port));
+        flows.sort(FLOW_ORDER);
+        for (FlowRule flow : flows) {
+            SortedSet<PortNumber> alternatives = new TreeSet<>(Comparator.comparingLong(PortNumber::toLong));
+            Criterion ethDst = flow.selector().getCriterion(Criterion.Type.ETH_DST);
+            if (ethDst != null) {
+                for (Host host : hostService.getHostsByMac(((EthCriterion) ethDst).mac())) {
+                    for (HostLocation location : host.locations()) {
+                        if (location.deviceId().equals(port.deviceId())) {
+                            continue;  // the destination is attached to this device
+                        }
+                        for (Path path : pathService.getPaths(port.deviceId(), location.deviceId())) {
+                            alternatives.add(path.src().port());
+                        }
+                    }
+                }
+            }
+            alternatives.remove(port.port());
+            actions.put(flow, alternatives);
+        }
+        return actions;
+    }
+
+    /**
+     * Returns the in port or MAC address a flow matches on in the format of the REST API, or an empty string.
+     *
+     * @param flow flow rule
+     * @param type type of an {@code IN_PORT}, {@code ETH_SRC} or {@code ETH_DST} criterion
+     * @return value of the criterion
+     */
+    private static String criterion(FlowRule flow, Criterion.Type type) {
+        Criterion criterion = flow.selector().getCriterion(type);
+        if (criterion instanceof PortCriterion) {
+            return ((PortCriterion) criterion).port().toString();
+        }
+        if (criterion instanceof EthCriterion) {
+            return ((EthCriterion) criterion).mac().toString();
+        }
+        return "";
+    }
+
+    /**
+     * Records the utilization of a port and posts an event if it crossed the threshold.
+     *
+     * @param port        port of a device
+     * @param utilization utilization between 0 and 1
+     */
+    void updateUtilization(ConnectPoint port, double utilization) {
+        utilizations.put(port, utilization);
+        if (utilization > threshold) {
+            if (congested.add(port)) {
+                post(CongestionEvent.Type.CONGESTED, port, utilization);
+            }
+        } else if (congested.remove(port)) {
+            post(CongestionEvent.Type.CLEARED, port, utilization);
+        }
+    }
+
+    private void post(CongestionEvent.Type type, ConnectPoint port, double utilization) {
+        synchronized (eventLock) {
+            CongestionEvent event = new CongestionEvent(++lastEventId, type, port, utilization,
+                                                        System.currentTimeMillis(), fwdFlows(port));
+            events.addLast(event);
+            while (events.size() > eventBacklog) {
+                events.removeFirst();
+            }
+            eventLock.notifyAll();
+            log.debug("{}", event);
+        }
+    }
+
+    private void updatePortStatistics(DeviceId deviceId) {
+        for (PortStatistics statistics : deviceService.getPortDeltaStatistics(deviceId)) {
+            Port port = deviceService.getPort(deviceId, statistics.portNumber());
+            double seconds = statistics.durationSec() + statistics.durationNano() / 1e9;
+            long speed = linkSpeed > 0 ? linkSpeed : port != null ? port.portSpeed() : 0;
+            if (seconds <= 0 || speed <= 0) {
+                continue;
+            }
+            double utilization = statistics.bytesSent() * 8 / seconds / (speed * 1_000_000.0);
+            updateUtilization(new ConnectPoint(deviceId, statistics.portNumber()), utilization);
+        }
+    }
+
+    private boolean isFwdFlow(FlowRule flow) {
+        ApplicationId appId = coreService.getAppId(flow.appId());
+        return appId != null && FWD_APP.equals(appId.name());
+    }
+
+    private static ConnectPoint outPort(FlowRule flow) {
+        for (Instruction instruction : flow.treatment().allInstructions()) {
+            if (instruction instanceof OutputInstruction) {
+                return new ConnectPoint(flow.deviceId(), ((OutputInstruction) instruction).port());
+            }
+        }
+        return null;
+    }
+
+    private void addFwdFlow(FlowRule flow) {
+        ConnectPoint port = outPort(flow);
+        if (port != null && isFwdFlow(flow)) {
+            fwdFlows.computeIfAbsent(port, p -> new ConcurrentHashMap<>()).put(flow.id(), flow);
+        }
+    }
+
+    private void removeFwdFlow(FlowRule flow) {
+        ConnectPoint port = outPort(flow);
+        Map<FlowId, FlowRule> flows = port != null ? fwdFlows.get(port) : null;
+        if (flows != null) {
+            flows.remove(flow.id());
+        }
+    }
+
+    private class InternalDeviceListener implements DeviceListener {
+        @Override
+        public void event(DeviceEvent event) {
+            if (event.type() == DeviceEvent.Type.PORT_STATS_UPDATED) {
+                updatePortStatistics(event.subject().id());
+            }
+        }
+    }
+
+    private class InternalFlowRuleListener implements FlowRuleListener {
+        @Override
+        public void event(FlowRuleEvent event) {
+            switch (event.type()) {
+                case RULE_ADDED:
+                case RULE_UPDATED:
+                    addFwdFlow(event.subject());
+                    break;
+                case RULE_REMOVED:
+                    removeFwdFlow(event.subject());
+                    break;
+                default:
+                    break;
+            }
+        }
+    }
+
+}
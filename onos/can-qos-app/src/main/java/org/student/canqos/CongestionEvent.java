@@ -0,0 +1,104 @@
+/*
+ * Copyright 2021-present Open Networking Foundation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+package org.student.canqos;
+
+import com.google.common.collect.ImmutableList;
+import org.onosproject.net.ConnectPoint;
+import org.onosproject.net.flow.FlowRule;
+
+import java.util.Collection;
+import java.util.List;
+
+import static com.google.common.base.MoreObjects.toStringHelper;
+
+/**
+ * Utilization of a port crossing the congestion threshold.
+ */
+public final class CongestionEvent {
+
+    /**
+     * Direction of the threshold crossing.
+     */
+    public enum Type {
+        /** Utilization rose above the threshold. */
+        CONGESTED,
+        /** Utilization fell back to or below the threshold. */
+        CLEARED
+    }
+
+    private final long id;
+    private final Type type;
+    private final ConnectPoint port;
+    private final double utilization;
+    private final long timestamp;
+    private final List<FlowRule> flows;
+
+    /**
+     * Creates a congestion event.
+     *
+     * @param id          sequence number, increasing with every event
+     * @param type        direction of the crossing
+     * @param port        port whose utilization crossed the threshold
+     * @param utilization utilization of the port
+     * @param timestamp   time of the crossing in milliseconds since the epoch
+     * @param flows       fwd flows sending traffic out of the port
+     */
+    public CongestionEvent(long id, Type type, ConnectPoint port, double utilization, long timestamp,
+                           Collection<FlowRule> flows) {
+        this.id = id;
+        this.type = type;
+        this.port = port;
+        this.utilization = utilization;
+        this.timestamp = timestamp;
+        this.flows = ImmutableList.copyOf(flows);
+    }
+
+    public long id() {
+        return id;
+    }
+
+    public Type type() {
+        return type;
+    }
+
+    public ConnectPoint port() {
+        return port;
+    }
+
+    public double utilization() {
+        return utilization;
+    }
+
+    public long timestamp() {
+        return timestamp;
+    }
+
+    public List<FlowRule> flows() {
+        return flows;
+    }
+
+    @Override
+    public String toString() {
+        return toStringHelper(this)
+                .add("id", id)
+                .add("type", type)
+                .add("port", port)
+                .add("utilization", utilization)
+                .add("flows", flows.size())
+                .toString();
+    }
+
+}
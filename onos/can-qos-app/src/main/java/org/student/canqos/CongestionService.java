@@ -0,0 +1,62 @@
+/*
+ * Copyright 2021-present Open Networking Foundation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+package org.student.canqos;
+
+import org.onosproject.net.ConnectPoint;
+import org.onosproject.net.flow.FlowRule;
+
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+
+/**
+ * Tracks the utilization of every port and reports ports whose utilization crosses the congestion threshold.
+ */
+public interface CongestionService {
+
+    /**
+     * Returns the utilization above which a port is congested.
+     *
+     * @return utilization between 0 and 1
+     */
+    double threshold();
+
+    /**
+     * Returns the latest utilization of every port with port statistics.
+     *
+     * @return utilization between 0 and 1, keyed by port
+     */
+    Map<ConnectPoint, Double> utilizations();
+
+    /**
+     * Returns the reactive forwarding flows that send traffic out of a port.
+     *
+     * @param port egress port
+     * @return flow rules installed by the fwd app with an output to the port
+     */
+    Set<FlowRule> fwdFlows(ConnectPoint port);
+
+    /**
+     * Returns the congestion events newer than an event, waiting for one if there are none yet.
+     *
+     * @param after         id of the last event seen by the caller, or 0
+     * @param timeoutMillis longest time to wait for a new event
+     * @return events in order of increasing id, empty if none occurred before the timeout
+     * @throws InterruptedException if interrupted while waiting
+     */
+    List<CongestionEvent> events(long after, long timeoutMillis) throws InterruptedException;
+
+}
@@ -13,10 +13,8 @@
  * See the License for the specific language governing permissions and
  * limitations under the License.
  */
-package org.student.can-qos-app;
 
-public interface SomeInterface {
-
-    void someMethod();
-
-}
\ No newline at end of file
+/**
+ * CAN QoS application detecting congested ports for the rerouting agent.
+ */
+package org.student.canqos;
\ No newline at end of file
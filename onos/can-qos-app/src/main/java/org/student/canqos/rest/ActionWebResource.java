@@ -0,0 +1,62 @@
+/*
+ * Copyright 2021-present Open Networking Foundation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+package org.student.canqos.rest;
+
+import com.fasterxml.jackson.databind.node.ArrayNode;
+import com.fasterxml.jackson.databind.node.ObjectNode;
+import org.onosproject.net.ConnectPoint;
+import org.onosproject.net.DeviceId;
+import org.onosproject.net.PortNumber;
+import org.onosproject.rest.AbstractWebResource;
+import org.student.canqos.ActionService;
+
+import javax.ws.rs.GET;
+import javax.ws.rs.Path;
+import javax.ws.rs.PathParam;
+import javax.ws.rs.Produces;
+import javax.ws.rs.core.MediaType;
+import javax.ws.rs.core.Response;
+
+/**
+ * Reroutes available to the rerouting agent.
+ */
+@Path("actions")
+public class ActionWebResource extends AbstractWebResource {
+
+    /**
+     * Gets the fwd flows leaving a port together with their alternative egress ports.
+     *
+     * @param deviceId device identifier
+     * @param port     egress port number
+     * @return 200 OK with one entry per flow, listing the ports of the device on a shortest path to its destination
+     */
+    @GET
+    @Path("{deviceId}/{port}")
+    @Produces(MediaType.APPLICATION_JSON)
+    public Response getActions(@PathParam("deviceId") String deviceId, @PathParam("port") String port) {
+        ConnectPoint egress = new ConnectPoint(DeviceId.deviceId(deviceId), PortNumber.fromString(port));
+        ObjectNode root = mapper().createObjectNode()
+                .put("device", egress.deviceId().toString())
+                .put("port", egress.port().toString());
+        ArrayNode actions = root.putArray("actions");
+        get(ActionService.class).actions(egress).forEach((flow, alternatives) -> {
+            ArrayNode ports = FwdFlowEncoder.encode(actions.addObject(), flow).putArray("alternatives");
+            alternatives.forEach(alternative -> ports.add(alternative.toString()));
+        });
+        return ok(root).build();
+    }
+
+}
@@ -13,35 +13,20 @@
  * See the License for the specific language governing permissions and
  * limitations under the License.
  */
-package org.student.can-qos-app;
+package org.student.canqos.rest;
 
-import org.junit.After;
-import org.junit.Before;
-import org.junit.Test;
-import org.onosproject.cfg.ComponentConfigAdapter;
+import org.onlab.rest.AbstractWebApplication;
+
+import java.util.Set;
 
 /**
- * Set of tests of the ONOS application component.
+ * CAN QoS REST API web application.
  */
-public class AppComponentTest {
-
-    private AppComponent component;
-
-    @Before
-    public void setUp() {
-        component = new AppComponent();
-        component.cfgService = new ComponentConfigAdapter();
-        component.activate();
-    }
-
-    @After
-    public void tearDown() {
-        component.deactivate();
-    }
-
-    @Test
-    public void basics() {
+public class AppWebApplication extends AbstractWebApplication {
 
+    @Override
+    public Set<Class<?>> getClasses() {
+        return getClasses(CongestionWebResource.class, ActionWebResource.class);
     }
 
 }
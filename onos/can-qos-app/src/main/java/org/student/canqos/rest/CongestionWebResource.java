@@ -0,0 +1,101 @@
+/*
+ * Copyright 2021-present Open Networking Foundation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+package org.student.canqos.rest;
+
+import com.fasterxml.jackson.databind.node.ArrayNode;
+import com.fasterxml.jackson.databind.node.ObjectNode;
+import org.onosproject.rest.AbstractWebResource;
+import org.student.canqos.CongestionEvent;
+import org.student.canqos.CongestionService;
+
+import javax.ws.rs.DefaultValue;
+import javax.ws.rs.GET;
+import javax.ws.rs.Path;
+import javax.ws.rs.Produces;
+import javax.ws.rs.QueryParam;
+import javax.ws.rs.core.MediaType;
+import javax.ws.rs.core.Response;
+import java.util.Collections;
+import java.util.List;
+
+/**
+ * Port utilization and congestion events.
+ */
+@Path("congestion")
+public class CongestionWebResource extends AbstractWebResource {
+
+    /** Longest time a client may wait for events, kept below common HTTP client and proxy timeouts. */
+    private static final long MAX_TIMEOUT_MILLIS = 60_000;
+
+    /**
+     * Gets the latest utilization of every port.
+     *
+     * @return 200 OK with the utilization of every port with port statistics
+     */
+    @GET
+    @Path("utilization")
+    @Produces(MediaType.APPLICATION_JSON)
+    public Response getUtilization() {
+        CongestionService service = get(CongestionService.class);
+        ObjectNode root = mapper().createObjectNode();
+        root.put("threshold", service.threshold());
+        ArrayNode ports = root.putArray("ports");
+        service.utilizations().forEach((port, utilization) -> ports.addObject()
+                .put("device", port.deviceId().toString())
+                .put("port", port.port().toString())
+                .put("utilization", utilization));
+        return ok(root).build();
+    }
+
+    /**
+     * Gets the congestion events newer than an event, waiting until one occurs or the timeout expires.
+     *
+     * @param after   id of the last event seen, or 0
+     * @param timeout longest time to wait for a new event in milliseconds
+     * @return 200 OK with the events and the id to pass as {@code after} in the next request
+     */
+    @GET
+    @Path("events")
+    @Produces(MediaType.APPLICATION_JSON)
+    public Response getEvents(@QueryParam("after") @DefaultValue("0") long after,
+                              @QueryParam("timeout") @DefaultValue("30000") long timeout) {
+        List<CongestionEvent> events;
+        try {
+            events = get(CongestionService.class).events(after, Math.min(Math.max(timeout, 0), MAX_TIMEOUT_MILLIS));
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            events = Collections.emptyList();
+        }
+        ObjectNode root = mapper().createObjectNode();
+        ArrayNode array = root.putArray("events");
+        long next = after;
+        for (CongestionEvent event : events) {
+            ObjectNode node = array.addObject()
+                    .put("id", event.id())
+                    .put("type", event.type().name())
+                    .put("device", event.port().deviceId().toString())
+                    .put("port", event.port().port().toString())
+                    .put("utilization", event.utilization())
+                    .put("timestamp", event.timestamp());
+            ArrayNode flows = node.putArray("flows");
+            event.flows().forEach(flow -> FwdFlowEncoder.encode(flows.addObject(), flow));
+            next = event.id();
+        }
+        root.put("next", next);
+        return ok(root).build();
+    }
+
+}
@@ -0,0 +1,59 @@
+/*
+ * Copyright 2021-present Open Networking Foundation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+package org.student.canqos.rest;
+
+import com.fasterxml.jackson.databind.node.ObjectNode;
+import org.onosproject.net.flow.FlowRule;
+import org.onosproject.net.flow.criteria.Criterion;
+import org.onosproject.net.flow.criteria.EthCriterion;
+import org.onosproject.net.flow.criteria.PortCriterion;
+import org.onosproject.net.flow.instructions.Instruction;
+import org.onosproject.net.flow.instructions.Instructions.OutputInstruction;
+
+/**
+ * Encodes the fields that identify a reactive forwarding flow to reroute.
+ */
+final class FwdFlowEncoder {
+
+    private FwdFlowEncoder() {
+    }
+
+    /**
+     * Adds the flow ID and the {@code ethSrc}, {@code ethDst}, {@code inPort} and {@code outPort} of a fwd flow to a JSON object.
+     *
+     * @param node JSON object to add the fields to
+     * @param flow flow rule installed by the fwd app
+     * @return the JSON object
+     */
+    static ObjectNode encode(ObjectNode node, FlowRule flow) {
+        node.put("id", Long.toString(flow.id().value()));
+        Criterion ethSrc = flow.selector().getCriterion(Criterion.Type.ETH_SRC);
+        Criterion ethDst = flow.selector().getCriterion(Criterion.Type.ETH_DST);
+        Criterion inPort = flow.selector().getCriterion(Criterion.Type.IN_PORT);
+        node.put("ethSrc", ethSrc != null ? ((EthCriterion) ethSrc).mac().toString() : "");
+        node.put("ethDst", ethDst != null ? ((EthCriterion) ethDst).mac().toString() : "");
+        node.put("inPort", inPort != null ? ((PortCriterion) inPort).port().toString() : "");
+        node.put("outPort", "");
+        for (Instruction instruction : flow.treatment().allInstructions()) {
+            if (instruction instanceof OutputInstruction) {
+                node.put("outPort", ((OutputInstruction) instruction).port().toString());
+                break;
+            }
+        }
+        return node;
+    }
+
+}
@@ -15,6 +15,6 @@
  */
 
 /**
- * ONOS application archetype.
+ * REST API of the CAN QoS application.
  */
-package org.student.can-qos-app;
\ No newline at end of file
+package org.student.canqos.rest;
@@ -0,0 +1,217 @@
+/*
+ * Copyright 2021-present Open Networking Foundation
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+package org.student.canqos;
+
+import org.junit.After;
+import org.junit.Before;
+import org.junit.Test;
+import org.onlab.graph.ScalarWeight;
+import org.onlab.packet.MacAddress;
+import org.onlab.packet.VlanId;
+import org.onosproject.cfg.ComponentConfigAdapter;
+import org.onosproject.core.ApplicationId;
+import org.onosproject.core.CoreServiceAdapter;
+import org.onosproject.core.DefaultApplicationId;
+import org.onosproject.net.ConnectPoint;
+import org.onosproject.net.DefaultHost;
+import org.onosproject.net.DefaultLink;
+import org.onosproject.net.DefaultPath;
+import org.onosproject.net.DeviceId;
+import org.onosproject.net.ElementId;
+import org.onosproject.net.Host;
+import org.onosproject.net.HostId;
+import org.onosproject.net.HostLocation;
+import org.onosproject.net.Link;
+import org.onosproject.net.Path;
+import org.onosproject.net.PortNumber;
+import org.onosproject.net.device.DeviceServiceAdapter;
+import org.onosproject.net.flow.DefaultFlowRule;
+import org.onosproject.net.flow.DefaultTrafficSelector;
+import org.onosproject.net.flow.DefaultTrafficTreatment;
+import org.onosproject.net.flow.FlowRule;
+import org.onosproject.net.flow.FlowRuleEvent;
+import org.onosproject.net.flow.FlowRuleServiceAdapter;
+import org.onosproject.net.host.HostServiceAdapter;
+import org.onosproject.net.provider.ProviderId;
+import org.onosproject.net.topology.PathServiceAdapter;
+
+import java.util.Collections;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.SortedSet;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertFalse;
+import static org.junit.Assert.assertTrue;
+
+/**
+ * Set of tests of the ONOS application component.
+ */
+public class AppComponentTest {
+
+    private static final ApplicationId FWD_APP_ID = new DefaultApplicationId(1, AppComponent.FWD_APP);
+    private static final DeviceId DEVICE = DeviceId.deviceId("of:0000000000000001");
+    private static final ConnectPoint PORT = new ConnectPoint(DEVICE, PortNumber.portNumber(2));
+    private static final DeviceId DST_DEVICE = DeviceId.deviceId("of:0000000000000004");
+    private static final MacAddress DST_MAC = MacAddress.valueOf("00:00:00:00:00:04");
+    private static final ProviderId PID = new ProviderId("of", "foo");
+
+    private AppComponent component;
+
+    @Before
+    public void setUp() {
+        component = new AppComponent();
+        component.cfgService = new ComponentConfigAdapter();
+        component.coreService = new CoreServiceAdapter() {
+            @Override
+            public ApplicationId getAppId(Short id) {
+                return id == FWD_APP_ID.id() ? FWD_APP_ID : null;
+            }
+        };
+        component.deviceService = new DeviceServiceAdapter();
+        component.flowRuleService = new FlowRuleServiceAdapter();
+        component.hostService = new HostServiceAdapter() {
+            @Override
+            public Set<Host> getHostsByMac(MacAddress mac) {
+                if (!mac.equals(DST_MAC)) {
+                    return Collections.emptySet();
+                }
+                return Set.of(new DefaultHost(PID, HostId.hostId(mac), mac, VlanId.NONE,
+                                              new HostLocation(DST_DEVICE, PortNumber.portNumber(1), 0),
+                                              Collections.emptySet()));
+            }
+        };
+        component.pathService = new PathServiceAdapter() {
+            @Override
+            public Set<Path> getPaths(ElementId src, ElementId dst) {
+                return Set.of(path(2), path(3));
+            }
+        };
+        component.activate(null);
+    }
+
+    @After
+    public void tearDown() {
+        component.deactivate();
+    }
+
+    private static FlowRule fwdFlow(int inPort, int outPort) {
+        return DefaultFlowRule.builder()
+                .forDevice(DEVICE)
+                .withSelector(DefaultTrafficSelector.builder()
+                                      .matchInPort(PortNumber.portNumber(inPort))
+                                      .matchEthSrc(MacAddress.valueOf("00:00:00:00:00:01"))
+                                      .matchEthDst(DST_MAC)
+                                      .build())
+                .withTreatment(DefaultTrafficTreatment.builder().setOutput(PortNumber.portNumber(outPort)).build())
+                .fromApp(FWD_APP_ID)
+                .withPriority(10)
+                .makeTemporary(10)
+                .build();
+    }
+
+    private static Path path(int outPort) {
+        Link link = DefaultLink.builder()
+                .providerId(PID)
+                .src(new ConnectPoint(DEVICE, PortNumber.portNumber(outPort)))
+                .dst(new ConnectPoint(DST_DEVICE, PortNumber.portNumber(outPort)))
+                .type(Link.Type.DIRECT)
+                .build();
+        return new DefaultPath(PID, List.of(link), ScalarWeight.toWeight(1));
+    }
+
+    @Test
+    public void basics() {
+        assertEquals(0.4, component.threshold(), 1e-9);
+        assertTrue(component.utilizations().isEmpty());
+    }
+
+    @Test
+    public void postsOnlyThresholdCrossings() throws InterruptedException {
+        component.updateUtilization(PORT, 0.2);
+        component.updateUtilization(PORT, 0.6);
+        component.updateUtilization(PORT, 0.7);
+        component.updateUtilization(PORT, 0.1);
+
+        List<CongestionEvent> events = component.events(0, 0);
+        assertEquals(2, events.size());
+        assertEquals(CongestionEvent.Type.CONGESTED, events.get(0).type());
+        assertEquals(CongestionEvent.Type.CLEARED, events.get(1).type());
+        assertEquals(1, component.events(events.get(0).id(), 0).size());
+        assertEquals(0.1, component.utilizations().get(PORT), 1e-9);
+    }
+
+    @Test
+    public void waitsForEventsUntilTimeout() throws InterruptedException {
+        long started = System.currentTimeMillis();
+        assertTrue(component.events(0, 50).isEmpty());
+        assertTrue(System.currentTimeMillis() - started >= 50);
+    }
+
+    @Test
+    public void deactivateReleasesWaitingClients() throws InterruptedException {
+        Thread client = new Thread(() -> {
+            try {
+                component.events(0, 60_000);
+            } catch (InterruptedException e) {
+                Thread.currentThread().interrupt();
+            }
+        });
+        client.start();
+        Thread.sleep(50);
+        long started = System.currentTimeMillis();
+        component.deactivate();
+        client.join(5_000);
+        assertFalse(client.isAlive());
+        assertTrue(System.currentTimeMillis() - started < 5_000);
+    }
+
+    @Test
+    public void eventsCarryFwdFlowsOfPort() throws InterruptedException {
+        FlowRule flow = fwdFlow(1, 2);
+        component.flowRuleListener.event(new FlowRuleEvent(FlowRuleEvent.Type.RULE_ADDED, flow));
+        component.flowRuleListener.event(new FlowRuleEvent(FlowRuleEvent.Type.RULE_ADDED, fwdFlow(2, 3)));
+        assertEquals(1, component.fwdFlows(PORT).size());
+
+        component.updateUtilization(PORT, 0.9);
+        assertEquals(flow, component.events(0, 0).get(0).flows().get(0));
+
+        component.flowRuleListener.event(new FlowRuleEvent(FlowRuleEvent.Type.RULE_REMOVED, flow));
+        assertTrue(component.fwdFlows(PORT).isEmpty());
+    }
+
+    @Test
+    public void actionsListAlternativeEgressPorts() {
+        FlowRule flow = fwdFlow(1, 2);
+        component.flowRuleListener.event(new FlowRuleEvent(FlowRuleEvent.Type.RULE_ADDED, flow));
+
+        Map<FlowRule, SortedSet<PortNumber>> actions = component.actions(PORT);
+        assertEquals(1, actions.size());
+        assertEquals(Set.of(PortNumber.portNumber(3)), actions.get(flow));
+    }
+
+    @Test
+    public void actionsAreOrderedByInPort() {
+        for (int inPort : new int[]{4, 1, 3}) {
+            component.flowRuleListener.event(new FlowRuleEvent(FlowRuleEvent.Type.RULE_ADDED, fwdFlow(inPort, 2)));
+        }
+
+        assertEquals(List.of(fwdFlow(1, 2), fwdFlow(3, 2), fwdFlow(4, 2)),
+                     List.copyOf(component.actions(PORT).keySet()));
+    }
+
+}